@@ -114,6 +114,17 @@ class ComposerAPI:
             raise ValueError(f"Ticker {ticker} not found in market data")
         
         data = self._market_data[ticker]
+        if data.empty or not (start_date or end_date):
+            return data
+        
+        index = data.index
+        if index.is_monotonic_increasing:
+            # Sorted dates: find the bounds by bisection and slice by position
+            # instead of building a comparison mask over every row. Copy the slice so
+            # callers get their own frame, as the mask path returns
+            lo = index.searchsorted(pd.to_datetime(start_date), side='left') if start_date else 0
+            hi = index.searchsorted(pd.to_datetime(end_date), side='right') if end_date else len(index)
+            return data.iloc[lo:hi].copy()
         
         if start_date:
             data = data[data.index >= pd.to_datetime(start_date)]
@@ -4,11 +4,48 @@ This module provides the ComposerStrategy class, which is responsible for
 parsing and evaluating trading strategies defined in a Composer.trade-style
 JSON format. It translates the LISP-like DSL into an executable trading logic.
 """
+import re
+from operator import eq, ge, gt, le, lt
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Any, Union
+from typing import Dict, List, Any, Tuple, Union
 import logging
 logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
 
+# Columns that are only ever compared against thresholds or each other, so
+# float32 precision is plenty for them.
+_FLOAT32_COLUMNS = re.compile(r'^(RSI_|MA_|current_price$|Close$)')
+
+
+def _parse_window(params: Any, default: int) -> int:
+    """
+    Reads the :window parameter of an indicator.
+
+    Handles both forms a {:window n} map takes after parsing: a dict, or a flat
+    [':window', n] list. Falls back to the default when no window is given.
+    """
+    if isinstance(params, dict):
+        return int(params[':window']) if ':window' in params else default
+    if isinstance(params, list):
+        try:
+            # list.index scans in C; the key must be followed by a value
+            i = params.index(':window', 0, len(params) - 1)
+        except ValueError:
+            return default
+        return int(params[i + 1])
+    return default
+
+
+# Comparison operators; these work on scalars and NumPy arrays alike
+_COMPARISONS = {
+    '>': gt,
+    '<': lt,
+    '>=': ge,
+    '<=': le,
+    '=': eq,
+}
+
+
 class ComposerStrategy:
     """
     Parses and evaluates a Composer.trade symphony JSON.
@@ -31,66 +68,130 @@ class ComposerStrategy:
         if not isinstance(symphony_json, list) or len(symphony_json) < 3:
             raise ValueError("Invalid symphony JSON structure.")
         self.symphony = symphony_json
+        self._column_cache: Dict[str, tuple] = {}
         self.market_data = market_data
         self.evaluation_date = None
+        self._filter_assets: Dict[int, List[str]] = {}
+        # Expression operators are dispatched with one dict lookup per node
+        self._handlers = {
+            'if': self._evaluate_if,
+            'weight-equal': self._evaluate_weight_equal,
+            'weight-specified': self._evaluate_weight_specified,
+            'asset': self._evaluate_asset,
+            'group': self._evaluate_group,
+            'filter': self._evaluate_filter,
+        }
 
-    def _get_data_for_date(self, symbol: str, date: pd.Timestamp) -> pd.Series:
+    @property
+    def market_data(self) -> Dict[str, pd.DataFrame]:
+        """Market data for each ticker. Assigning it resets the cached column arrays."""
+        return self._market_data
+
+    @market_data.setter
+    def market_data(self, market_data: Dict[str, pd.DataFrame]):
+        self._market_data = self._downcast_market_data(market_data)
+        self._column_cache.clear()
+
+    @staticmethod
+    def _downcast_market_data(market_data: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
         """
-        Safely retrieves the row of data for a specific symbol and date.
-        Uses direct indexing to get data for the exact date.
+        Returns the market data with indicator and price columns as float32.
+
+        Indicator lookups dominate evaluation time, and halving the width of
+        the underlying arrays keeps more of them resident in cache. Close is
+        downcast together with the indicators so that price-vs-MA comparisons
+        are made at the same precision on both sides. Frames that need a cast
+        are converted into copies; the caller's DataFrames are never modified.
         """
-        if symbol not in self.market_data or self.market_data[symbol].empty:
-            raise ValueError(f"Market data not available for symbol: {symbol}")
-        
-        # Try to get data for the exact date first
-        if date in self.market_data[symbol].index:
-            data_for_date = self.market_data[symbol].loc[date]
-            return data_for_date
-        
-        # If exact date not found, use asof to get the most recent data on or before the date
-        data_for_date = self.market_data[symbol].asof(date)
-        
-        # Check if we got any valid data (ignore NaN indicators)
-        if pd.isna(data_for_date).all():
+        downcast = {}
+        for symbol, df in market_data.items():
+            casts = {col: np.float32 for col in df.columns
+                     if isinstance(col, str) and _FLOAT32_COLUMNS.match(col)
+                     and df[col].dtype != np.float32}
+            downcast[symbol] = df.astype(casts) if casts else df
+        return downcast
+
+    def _get_columns(self, symbol: str) -> tuple:
+        """
+        Returns cached NumPy views of a symbol's market data.
+
+        The tuple holds the index values, a mapping of column name to array and
+        the positions of rows without any NaN (the rows `asof` may fall back to),
+        so that lookups can be done positionally instead of through pandas.
+        Entries are tied to the DataFrame they were read from and rebuilt when
+        a symbol's frame is replaced.
+        """
+        df = self.market_data.get(symbol)
+        entry = self._column_cache.get(symbol)
+        if entry is None or entry[0] is not df:
+            if df is None or df.empty:
+                raise ValueError(f"Market data not available for symbol: {symbol}")
+            columns = {col: df[col].to_numpy() for col in df.columns}
+            complete_rows = np.flatnonzero(df.notna().all(axis=1).to_numpy())
+            entry = (df, (df.index.values, columns, complete_rows))
+            self._column_cache[symbol] = entry
+        return entry[1]
+
+    def _get_row_position(self, symbol: str, date: pd.Timestamp) -> int:
+        """
+        Returns the row position to read for a symbol on a date.
+
+        The exact date if present, otherwise the most recent complete row on
+        or before it, as DataFrame.asof would pick.
+        """
+        index, _, complete_rows = self._get_columns(symbol)
+        position = index.searchsorted(date.to_datetime64(), side='right') - 1
+        if position >= 0 and index[position] == date.to_datetime64():
+            return position
+
+        fallback = complete_rows.searchsorted(position, side='right') - 1
+        if position < 0 or fallback < 0:
             raise ValueError(f"No data available for {symbol} on or before {date.strftime('%Y-%m-%d')}")
-            
-        return data_for_date
+        return complete_rows[fallback]
+
+    def _indicator_column(self, indicator_type: str, indicator_params: Any) -> Union[str, None]:
+        """
+        Maps an indicator type and its parameters to a market data column name.
+
+        The parameters are read with _parse_window, like every other :window, so
+        dict and flat-list forms give the same column. None is returned for an
+        unknown indicator or a window that is not an integer.
+        """
+        try:
+            if indicator_type == 'rsi':
+                return f"RSI_{_parse_window(indicator_params, 10)}"  # default to 10
+            elif indicator_type == 'moving-average-price':
+                return f"MA_{_parse_window(indicator_params, 20)}"  # default to 20
+            elif indicator_type == 'current-price':
+                return 'current_price'
+        except (TypeError, ValueError):
+            pass
+        return None
 
-    def _get_indicator_value(self, symbol: str, indicator_type: str, indicator_params: dict) -> float:
+    def _get_value(self, symbol: str, column: str) -> float:
+        """Returns a symbol's column value on the evaluation date, read by row position."""
+        position = self._get_row_position(symbol, self.evaluation_date)
+        return self._get_columns(symbol)[1][column][position]
+
+    def _get_indicator_value(self, symbol: str, indicator_type: str, indicator_params: Any) -> float:
         """
         Gets the indicator value for a specific symbol and indicator type.
 
         Args:
             symbol (str): The ticker symbol.
             indicator_type (str): The type of indicator (e.g., 'rsi', 'moving-average-price').
-            indicator_params (dict): Parameters for the indicator (e.g., window size).
+            indicator_params (Any): Parameters for the indicator (e.g., window size), as a dict or flat list.
         Returns:
             float: The indicator value, or None if not available.
         """
+        column = self._indicator_column(indicator_type, indicator_params)
+        if column is None:
+            return None
         try:
-            data = self._get_data_for_date(symbol, self.evaluation_date)
-            
-            if indicator_type == 'rsi':
-                window = int(indicator_params.get(':window', 10))  # default to 10
-                rsi_col = f'RSI_{window}'
-                if rsi_col in data:
-                    return data[rsi_col]
-                else:
-                    return None
-            elif indicator_type == 'moving-average-price':
-                window = int(indicator_params.get(':window', 20))  # default to 20
-                ma_col = f'MA_{window}'
-                if ma_col in data:
-                    return data[ma_col]
-                else:
-                    return None
-            elif indicator_type == 'current-price':
-                if 'current_price' in data:
-                    return data['current_price']
-                else:
-                    return None
-            else:
+            _, columns, _ = self._get_columns(symbol)
+            if column not in columns:
                 return None
+            return columns[column][self._get_row_position(symbol, self.evaluation_date)]
         except Exception:
             return None
 
@@ -111,43 +212,21 @@ class ComposerStrategy:
         try:
             if operator == 'current-price':
                 symbol = value_expression[1]
-                return self._get_data_for_date(symbol, self.evaluation_date)['Close']
+                return self._get_value(symbol, 'Close')
             
             elif operator == 'moving-average-price':
                 symbol = value_expression[1]
-                params = value_expression[2]
-                if isinstance(params, dict):
-                    window = int(params.get(':window', 20))  # default to 20
-                elif isinstance(params, list):
-                    window = 20  # default
-                    for i in range(len(params) - 1):
-                        if params[i] == ':window':
-                            window = int(params[i + 1])
-                            break
-                else:
-                    window = 20  # default
-                ma_column = f'MA_{window}'
+                ma_column = f'MA_{_parse_window(value_expression[2], 20)}'  # default to 20
                 if ma_column not in self.market_data[symbol].columns:
                      raise ValueError(f"Indicator '{ma_column}' not found for {symbol}. Please calculate it first.")
-                return self._get_data_for_date(symbol, self.evaluation_date)[ma_column]
+                return self._get_value(symbol, ma_column)
 
             elif operator == 'rsi':
                 symbol = value_expression[1]
-                params = value_expression[2]
-                if isinstance(params, dict):
-                    window = int(params.get(':window', 10))  # default to 10
-                elif isinstance(params, list):
-                    window = 10  # default
-                    for i in range(len(params) - 1):
-                        if params[i] == ':window':
-                            window = int(params[i + 1])
-                            break
-                else:
-                    window = 10  # default
-                rsi_column = f'RSI_{window}'
+                rsi_column = f'RSI_{_parse_window(value_expression[2], 10)}'  # default to 10
                 if rsi_column not in self.market_data[symbol].columns:
                     raise ValueError(f"Indicator '{rsi_column}' not found for {symbol}. Please calculate it first.")
-                return self._get_data_for_date(symbol, self.evaluation_date)[rsi_column]
+                return self._get_value(symbol, rsi_column)
             
             else:
                 raise ValueError(f"Unknown value operator: {operator}")
@@ -165,18 +244,10 @@ class ComposerStrategy:
         operand1 = self._resolve_value(operand1_expr)
         operand2 = self._resolve_value(operand2_expr)
 
-        if operator == '>':
-            return operand1 > operand2
-        elif operator == '<':
-            return operand1 < operand2
-        elif operator == '>=':
-            return operand1 >= operand2
-        elif operator == '<=':
-            return operand1 <= operand2
-        elif operator == '=':
-            return operand1 == operand2
-        else:
+        compare = _COMPARISONS.get(operator) if isinstance(operator, str) else None
+        if compare is None:
             raise ValueError(f"Unknown comparison operator: {operator}")
+        return compare(operand1, operand2)
 
     def _evaluate_expression(self, expression: List) -> Dict[str, float]:
         """
@@ -187,147 +258,167 @@ class ComposerStrategy:
             return {}
             
         operator = expression[0]
-        
-        if operator == 'if':
-            # Structure: (if condition then_branch else_branch)
-            _, condition, then_branch, else_branch = expression
-            if self._evaluate_condition(condition):
-                return self._evaluate_expression(then_branch)
-            else:
-                return self._evaluate_expression(else_branch)
+        handler = self._handlers.get(operator) if isinstance(operator, str) else None
+        if handler is not None:
+            return handler(expression)
+        return self._evaluate_expression_list(expression)
 
-        elif operator == 'weight-equal':
-            # Structure: (weight-equal [branch1] [branch2] ...)
-            # Each branch should be evaluated independently
-            branches = expression[1:]
-            if not branches:
-                return {}
-            
-            # Evaluate each branch and collect results
-            all_results = []
-            for branch in branches:
-                branch_result = self._evaluate_expression(branch)
-                if branch_result:  # Only add non-empty results
-                    all_results.append(branch_result)
-            
-            # If no valid results, return empty
-            if not all_results:
-                return {}
-            
-            # Combine all results and distribute weights equally
-            combined_assets = {}
-            for result in all_results:
-                for asset, weight in result.items():
-                    if asset in combined_assets:
-                        combined_assets[asset] += weight
-                    else:
-                        combined_assets[asset] = weight
-            
-            # Normalize weights to sum to 1.0
-            total_weight = sum(combined_assets.values())
-            if total_weight > 0:
-                return {asset: weight / total_weight for asset, weight in combined_assets.items()}
-            
+    def _evaluate_if(self, expression: List) -> Dict[str, float]:
+        """Evaluates (if condition then_branch else_branch)."""
+        _, condition, then_branch, else_branch = expression
+        if self._evaluate_condition(condition):
+            return self._evaluate_expression(then_branch)
+        else:
+            return self._evaluate_expression(else_branch)
+
+    def _evaluate_weight_equal(self, expression: List) -> Dict[str, float]:
+        """Evaluates (weight-equal [branch1] [branch2] ...), each branch independently."""
+        branches = expression[1:]
+        if not branches:
+            return {}
+        
+        # Evaluate each branch and collect results
+        all_results = []
+        for branch in branches:
+            branch_result = self._evaluate_expression(branch)
+            if branch_result:  # Only add non-empty results
+                all_results.append(branch_result)
+        
+        # If no valid results, return empty
+        if not all_results:
             return {}
+        
+        # Combine all results and distribute weights equally
+        combined_assets = {}
+        for result in all_results:
+            for asset, weight in result.items():
+                if asset in combined_assets:
+                    combined_assets[asset] += weight
+                else:
+                    combined_assets[asset] = weight
+        
+        # Normalize weights to sum to 1.0
+        total_weight = sum(combined_assets.values())
+        if total_weight > 0:
+            return {asset: weight / total_weight for asset, weight in combined_assets.items()}
+        
+        return {}
 
-        elif operator == 'weight-specified':
-            # Structure: (weight-specified weight1 asset1 weight2 asset2 ...)
-            portfolio = {}
-            total_weight = 0
-            
-            for i in range(1, len(expression), 2):
-                if i + 1 < len(expression):
-                    weight = float(expression[i])
-                    asset_expr = expression[i + 1]
-                    asset_portfolio = self._evaluate_expression(asset_expr)
-                    
-                    for asset, _ in asset_portfolio.items():
-                        portfolio[asset] = weight
-                        total_weight += weight
-            
-            # Normalize weights
-            if total_weight > 0:
-                return {asset: weight / total_weight for asset, weight in portfolio.items()}
-            
-            return portfolio
+    def _evaluate_weight_specified(self, expression: List) -> Dict[str, float]:
+        """Evaluates (weight-specified weight1 asset1 weight2 asset2 ...)."""
+        portfolio = {}
+        total_weight = 0
+        
+        for i in range(1, len(expression), 2):
+            if i + 1 < len(expression):
+                weight = float(expression[i])
+                asset_expr = expression[i + 1]
+                asset_portfolio = self._evaluate_expression(asset_expr)
+                
+                for asset, _ in asset_portfolio.items():
+                    portfolio[asset] = weight
+                    total_weight += weight
+        
+        # Normalize weights
+        if total_weight > 0:
+            return {asset: weight / total_weight for asset, weight in portfolio.items()}
+        
+        return portfolio
 
-        elif operator == 'asset':
-            # Base case: returns the asset itself with weight 1.0
-            return {expression[1]: 1.0}
+    def _evaluate_asset(self, expression: List) -> Dict[str, float]:
+        """Base case: returns the asset itself with weight 1.0."""
+        return {expression[1]: 1.0}
+
+    def _evaluate_group(self, expression: List) -> Dict[str, float]:
+        """A group contains a sub-expression that defines the assets within it."""
+        return self._evaluate_expression(expression[2])
+
+    def _evaluate_filter(self, expression: List) -> Dict[str, float]:
+        """Evaluates (filter indicator_criteria selection_method asset_list)."""
+        indicator_criteria = expression[1]
+        selection_method = expression[2]
+        asset_list = expression[3]
         
-        elif operator == 'group':
-            # A group contains a sub-expression that defines the assets within it
-            return self._evaluate_expression(expression[2])
+        if not asset_list:
+            return {}
+        
+        # Extract indicator parameters
+        if isinstance(indicator_criteria, list) and len(indicator_criteria) >= 2:
+            indicator_type = indicator_criteria[0]
+            indicator_params = indicator_criteria[2] if len(indicator_criteria) > 2 else {}
+        else:
+            return {}
+        
+        # Gather the indicator for every candidate in one pass, skipping
+        # symbols without data, then rank the values in a single argsort.
+        asset_scores = []
+        for asset in self._get_filter_assets(expression):
+            indicator_value = self._get_indicator_value(asset, indicator_type, indicator_params)
+            if indicator_value is not None:
+                asset_scores.append((asset, indicator_value))
+        
+        if not asset_scores:
+            return {}
+        
+        # Sort and select
+        if isinstance(selection_method, list) and len(selection_method) >= 2:
+            method = selection_method[0]
+            count = selection_method[1] if len(selection_method) > 1 else 1
+        else:
+            method = 'select-top'
+            count = 1
+        
+        # A stable sort keeps ties in asset-list order, as before. NaN scores
+        # rank after every real score for select-top and select-bottom alike
+        # (list.sort left them wherever the comparisons happened to stop).
+        scores = np.fromiter((value for _, value in asset_scores), dtype=np.float64,
+                             count=len(asset_scores))
+        order = np.argsort(-scores if method == 'select-top' else scores, kind='stable')
+        
+        # Return equal weights for selected assets
+        selected_assets = [asset_scores[i][0] for i in order[:count]]
+        if selected_assets:
+            equal_weight = 1.0 / len(selected_assets)
+            return {asset: equal_weight for asset in selected_assets}
+        
+        return {}
 
-        elif operator == 'filter':
-            # Structure: (filter indicator_criteria selection_method asset_list)
-            indicator_criteria = expression[1]
-            selection_method = expression[2]
-            asset_list = expression[3]
-            
-            if not asset_list:
-                return {}
-            
-            # Extract indicator parameters
-            if isinstance(indicator_criteria, list) and len(indicator_criteria) >= 2:
-                indicator_type = indicator_criteria[0]
-                indicator_params = indicator_criteria[2] if len(indicator_criteria) > 2 else {}
-            else:
-                return {}
-            
-            # Evaluate indicator for each asset
-            asset_scores = []
-            for asset_expr in asset_list:
+    def _evaluate_expression_list(self, expression: List) -> Dict[str, float]:
+        """Evaluates a bare list of expressions (a node without a known operator)."""
+        # Check if this is a list of asset expressions
+        asset_expressions = [item for item in expression if isinstance(item, list) and len(item) >= 2 and item[0] == 'asset']
+        
+        if len(asset_expressions) > 1:
+            # Multiple assets - equal weight
+            equal_weight = 1.0 / len(asset_expressions)
+            portfolio = {}
+            for asset_expr in asset_expressions:
                 asset_portfolio = self._evaluate_expression(asset_expr)
                 for asset, _ in asset_portfolio.items():
-                    indicator_value = self._get_indicator_value(asset, indicator_type, indicator_params)
-                    if indicator_value is not None:
-                        asset_scores.append((asset, indicator_value))
-            
-            if not asset_scores:
-                return {}
-            
-            # Sort and select
-            if isinstance(selection_method, list) and len(selection_method) >= 2:
-                method = selection_method[0]
-                count = selection_method[1] if len(selection_method) > 1 else 1
-            else:
-                method = 'select-top'
-                count = 1
-            
-            if method == 'select-top':
-                asset_scores.sort(key=lambda x: x[1], reverse=True)
-            else:
-                asset_scores.sort(key=lambda x: x[1], reverse=False)
-            
-            # Return equal weights for selected assets
-            selected_assets = asset_scores[:count]
-            if selected_assets:
-                equal_weight = 1.0 / len(selected_assets)
-                return {asset: equal_weight for asset, _ in selected_assets}
-            
-            return {}
+                    portfolio[asset] = equal_weight
+            return portfolio
+        elif len(expression) == 1 and isinstance(expression[0], list):
+            # Single sub-expression
+            return self._evaluate_expression(expression[0])
+        
+        raise ValueError(f"Unknown expression operator: {expression[0]}")
 
-        else:
-            # Handle lists of expressions
-            if isinstance(expression, list):
-                # Check if this is a list of asset expressions
-                asset_expressions = [item for item in expression if isinstance(item, list) and len(item) >= 2 and item[0] == 'asset']
-                
-                if len(asset_expressions) > 1:
-                    # Multiple assets - equal weight
-                    equal_weight = 1.0 / len(asset_expressions)
-                    portfolio = {}
-                    for asset_expr in asset_expressions:
-                        asset_portfolio = self._evaluate_expression(asset_expr)
-                        for asset, _ in asset_portfolio.items():
-                            portfolio[asset] = equal_weight
-                    return portfolio
-                elif len(expression) == 1 and isinstance(expression[0], list):
-                    # Single sub-expression
-                    return self._evaluate_expression(expression[0])
-            
-            raise ValueError(f"Unknown expression operator: {operator}")
+    def _get_filter_assets(self, expression: List) -> List[str]:
+        """
+        Returns the candidate symbols of a filter expression.
+
+        Filters over plain asset lists are resolved once and cached by node, as
+        their candidates do not depend on the evaluation date.
+        """
+        cached = self._filter_assets.get(id(expression))
+        if cached is not None:
+            return cached
+
+        asset_list = expression[3]
+        assets = [asset for asset_expr in asset_list for asset in self._evaluate_expression(asset_expr)]
+        if all(isinstance(item, list) and item and item[0] == 'asset' for item in asset_list):
+            self._filter_assets[id(expression)] = assets
+        return assets
 
     def get_target_portfolio(self, date: Union[str, pd.Timestamp]) -> Dict[str, float]:
         """
@@ -353,3 +444,253 @@ class ComposerStrategy:
             return {asset: weight / total_weight for asset, weight in portfolio.items()}
         
         return portfolio
+
+    def get_target_portfolios_batch(self, dates) -> Tuple[np.ndarray, List[str], np.ndarray]:
+        """
+        Evaluates the strategy for many dates at once.
+
+        Conditions are evaluated as vectors over all dates and both branches of
+        every `if` are blended with the condition mask, so the tree is walked
+        once instead of once per date. Results match get_target_portfolio up to
+        floating-point rounding.
+
+        Args:
+            dates: The dates for which to evaluate the strategy.
+
+        Returns:
+            Tuple[np.ndarray, List[str], np.ndarray]: A (n_dates, n_assets) weight
+                matrix, the symbols of its columns, and a boolean mask of the dates
+                the batch could not evaluate. get_target_portfolio raises for those
+                dates and should be used to report the error.
+        """
+        self._batch_dates = pd.DatetimeIndex(pd.to_datetime(dates)).values
+        self._batch_positions = {}
+        assets = self._collect_assets(self.symphony[2])
+        self._batch_assets = {asset: i for i, asset in enumerate(assets)}
+        try:
+            weights, _, failed = self._evaluate_batch(self.symphony[2])
+        finally:
+            self._batch_positions = {}
+
+        # Normalize weights to sum to 1, as a safeguard.
+        total_weight = weights.sum(axis=1, keepdims=True)
+        np.divide(weights, total_weight, out=weights, where=total_weight > 0)
+        return weights, assets, failed
+
+    def _collect_assets(self, expression: List) -> List[str]:
+        """Returns the symbols of all asset nodes in an expression, in tree order."""
+        assets = {}
+        stack = [expression]
+        pop, push = stack.pop, stack.extend
+        while stack:
+            expr = pop()
+            if type(expr) is not list:
+                continue
+            if len(expr) >= 2 and expr[0] == 'asset' and isinstance(expr[1], str):
+                assets[expr[1]] = None
+            # Leaves never hold assets, so only sub-lists are pushed
+            push(item for item in reversed(expr) if type(item) is list)
+        return list(assets)
+
+    def _empty_batch(self, failed: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns an empty (weights, members, failed) batch result."""
+        shape = (len(self._batch_dates), len(self._batch_assets))
+        return (np.zeros(shape), np.zeros(shape, dtype=bool),
+                np.full(len(self._batch_dates), failed))
+
+    def _get_row_positions(self, symbol: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized _get_row_position over the batch dates.
+
+        Returns the row positions and a mask of dates that have no row to read.
+        """
+        cached = self._batch_positions.get(symbol)
+        if cached is None:
+            index, _, complete_rows = self._get_columns(symbol)
+            dates = self._batch_dates
+            positions = index.searchsorted(dates, side='right') - 1
+            exact = positions >= 0
+            exact[exact] = index[positions[exact]] == dates[exact]
+
+            fallback = complete_rows.searchsorted(positions, side='right') - 1
+            missing = ~exact & ((positions < 0) | (fallback < 0))
+            if len(complete_rows):
+                positions = np.where(exact, positions, complete_rows[np.maximum(fallback, 0)])
+            cached = (np.maximum(positions, 0), missing)
+            self._batch_positions[symbol] = cached
+        return cached
+
+    def _resolve_value_batch(self, value_expression: Union[List, str, int, float]) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized _resolve_value: returns the values and a mask of failed dates."""
+        n_dates = len(self._batch_dates)
+        if not isinstance(value_expression, list):
+            return np.full(n_dates, float(value_expression)), np.zeros(n_dates, dtype=bool)
+
+        operator = value_expression[0]
+        symbol = value_expression[1]
+        if operator == 'current-price':
+            column = 'Close'
+        elif operator == 'moving-average-price':
+            column = f'MA_{_parse_window(value_expression[2], 20)}'
+        elif operator == 'rsi':
+            column = f'RSI_{_parse_window(value_expression[2], 10)}'
+        else:
+            raise ValueError(f"Unknown value operator: {operator}")
+
+        _, columns, _ = self._get_columns(symbol)
+        positions, missing = self._get_row_positions(symbol)
+        # Compare in float64, as the per-day path does with pandas rows
+        return columns[column][positions].astype(np.float64), missing
+
+    def _evaluate_condition_batch(self, condition: List) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized _evaluate_condition: returns the outcomes and a mask of failed dates."""
+        try:
+            operator, operand1_expr, operand2_expr = condition
+            operand1, failed1 = self._resolve_value_batch(operand1_expr)
+            operand2, failed2 = self._resolve_value_batch(operand2_expr)
+            return _COMPARISONS[operator](operand1, operand2), failed1 | failed2
+        except Exception:
+            n_dates = len(self._batch_dates)
+            return np.zeros(n_dates, dtype=bool), np.ones(n_dates, dtype=bool)
+
+    def _evaluate_batch(self, expression: List) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorized _evaluate_expression.
+
+        Returns (weights, members, failed): the weight matrix, which assets each
+        date's portfolio contains (a portfolio may hold zero weights), and the
+        dates whose per-day evaluation would raise. Anything this method cannot
+        express is marked as failed so that those dates go through the per-day
+        path instead.
+        """
+        try:
+            return self._evaluate_batch_node(expression)
+        except Exception:
+            return self._empty_batch(failed=True)
+
+    def _evaluate_batch_node(self, expression: List) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Evaluates a single node for _evaluate_batch."""
+        if not expression:
+            return self._empty_batch()
+
+        operator = expression[0]
+
+        if operator == 'if':
+            _, condition, then_branch, else_branch = expression
+            outcome, failed = self._evaluate_condition_batch(condition)
+            then_weights, then_members, then_failed = self._evaluate_batch(then_branch)
+            else_weights, else_members, else_failed = self._evaluate_batch(else_branch)
+            pick = outcome[:, None]
+            return (np.where(pick, then_weights, else_weights),
+                    np.where(pick, then_members, else_members),
+                    failed | np.where(outcome, then_failed, else_failed))
+
+        elif operator == 'weight-equal':
+            weights, members, failed = self._empty_batch()
+            for branch in expression[1:]:
+                branch_weights, branch_members, branch_failed = self._evaluate_batch(branch)
+                weights += branch_weights
+                members |= branch_members
+                failed |= branch_failed
+
+            total_weight = weights.sum(axis=1, keepdims=True)
+            keep = total_weight > 0
+            weights = np.divide(weights, total_weight, out=np.zeros_like(weights), where=keep)
+            return weights, members & keep, failed
+
+        elif operator == 'weight-specified':
+            weights, members, failed = self._empty_batch()
+            total_weight = np.zeros(len(self._batch_dates))
+            for i in range(1, len(expression), 2):
+                if i + 1 < len(expression):
+                    weight = float(expression[i])
+                    _, asset_members, asset_failed = self._evaluate_batch(expression[i + 1])
+                    weights[asset_members] = weight
+                    members |= asset_members
+                    total_weight += weight * asset_members.sum(axis=1)
+                    failed |= asset_failed
+
+            total_weight = total_weight[:, None]
+            np.divide(weights, total_weight, out=weights, where=total_weight > 0)
+            return weights, members, failed
+
+        elif operator == 'asset':
+            weights, members, failed = self._empty_batch()
+            column = self._batch_assets[expression[1]]
+            weights[:, column] = 1.0
+            members[:, column] = True
+            return weights, members, failed
+
+        elif operator == 'group':
+            return self._evaluate_batch(expression[2])
+
+        elif operator == 'filter':
+            return self._evaluate_filter_batch(expression)
+
+        else:
+            asset_expressions = [item for item in expression if isinstance(item, list) and len(item) >= 2 and item[0] == 'asset']
+            if len(asset_expressions) > 1:
+                weights, members, failed = self._empty_batch()
+                for asset_expr in asset_expressions:
+                    column = self._batch_assets[asset_expr[1]]
+                    weights[:, column] = 1.0 / len(asset_expressions)
+                    members[:, column] = True
+                return weights, members, failed
+            elif len(expression) == 1 and isinstance(expression[0], list):
+                return self._evaluate_batch(expression[0])
+
+            raise ValueError(f"Unknown expression operator: {operator}")
+
+    def _evaluate_filter_batch(self, expression: List) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorized filter over plain asset lists.
+
+        Each date ranks the candidates that have a value on that date, with
+        NaN scores after real ones and ties kept in asset-list order, exactly
+        like the stable argsort of the per-day path.
+        """
+        indicator_criteria = expression[1]
+        selection_method = expression[2]
+        asset_list = expression[3]
+        weights, members, failed = self._empty_batch()
+
+        if not asset_list or not (isinstance(indicator_criteria, list) and len(indicator_criteria) >= 2):
+            return weights, members, failed
+        if not all(isinstance(item, list) and item and item[0] == 'asset' for item in asset_list):
+            raise ValueError("Only filters over plain asset lists are batched")
+
+        if isinstance(selection_method, list) and len(selection_method) >= 2:
+            method, count = selection_method[0], selection_method[1]
+        else:
+            method, count = 'select-top', 1
+        if not isinstance(count, int) or count < 0:
+            raise ValueError(f"Unsupported selection count: {count}")
+
+        indicator_params = indicator_criteria[2] if len(indicator_criteria) > 2 else {}
+        column = self._indicator_column(indicator_criteria[0], indicator_params)
+        candidates = [item[1] for item in asset_list]
+        n_dates = len(self._batch_dates)
+        scores = np.zeros((n_dates, len(candidates)))
+        available = np.zeros((n_dates, len(candidates)), dtype=bool)
+        if column is not None:
+            for j, symbol in enumerate(candidates):
+                try:
+                    _, columns, _ = self._get_columns(symbol)
+                except ValueError:
+                    continue
+                if column in columns:
+                    positions, missing = self._get_row_positions(symbol)
+                    scores[:, j] = columns[column][positions]
+                    available[:, j] = ~missing
+
+        is_nan = np.isnan(scores)
+        keys = np.where(is_nan, 0.0, -scores if method == 'select-top' else scores)
+        order = np.lexsort((keys, is_nan, ~available), axis=-1)
+        selected_count = np.minimum(available.sum(axis=1), count)
+
+        candidate_columns = np.array([self._batch_assets[symbol] for symbol in candidates])
+        rows, ranks = np.nonzero(np.arange(len(candidates)) < selected_count[:, None])
+        selected = candidate_columns[order[rows, ranks]]
+        weights[rows, selected] = 1.0 / selected_count[rows]
+        members[rows, selected] = True
+        return weights, members, failed
@@ -0,0 +1,203 @@
+"""
+Indicator Kernels
+
+This module computes the technical indicators used by symphonies (Wilder RSI and
+simple moving averages) directly on NumPy arrays of closing prices. All windows
+for a ticker are produced by one fused kernel, JIT-compiled with numba when it is
+installed. Without numba the same values are computed with pandas' window
+functions.
+
+The kernels reproduce pandas' `ewm(alpha=1/n, min_periods=n).mean()` and
+`rolling(n).mean()` arithmetic exactly. That is the adjusted-EWM Wilder average
+(rma) of pandas-ta 0.3.x. Later pandas-ta releases and forks seed the average
+with an SMA and use `adjust=False`, which gives different RSI values.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Sequence, Tuple
+
+try:
+    from numba import njit
+except ImportError:  # numba is an optional speedup
+    njit = None
+
+
+def _ewm_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Adjusted exponential mean with alpha=1/window, as pandas' `ewm` computes it."""
+    n = values.shape[0]
+    out = np.empty(n)
+    if n == 0:
+        return out
+    old_wt_factor = 1.0 - 1.0 / window
+    weighted = values[0]
+    nobs = 1 if weighted == weighted else 0
+    out[0] = weighted if nobs >= window else np.nan
+    old_wt = 1.0
+    for i in range(1, n):
+        cur = values[i]
+        is_observation = cur == cur
+        if is_observation:
+            nobs += 1
+        if weighted == weighted:
+            old_wt *= old_wt_factor
+            if is_observation:
+                # Skipping equal values avoids drift on constant series
+                if weighted != cur:
+                    weighted = (old_wt * weighted + cur) / (old_wt + 1.0)
+                old_wt += 1.0
+        elif is_observation:
+            weighted = cur
+        out[i] = weighted if nobs >= window else np.nan
+    return out
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Compensated running-sum mean over a fixed window, as pandas' `rolling` computes it."""
+    n = values.shape[0]
+    out = np.empty(n)
+    nobs = 0
+    neg_ct = 0
+    sum_x = 0.0
+    compensation_add = 0.0
+    compensation_remove = 0.0
+    same_count = 0
+    prev_value = 0.0
+    for i in range(n):
+        if i == 0 or window == 1:
+            # pandas restarts the sum whenever a window shares no rows with
+            # the previous one
+            nobs = 0
+            neg_ct = 0
+            sum_x = 0.0
+            compensation_add = 0.0
+            compensation_remove = 0.0
+        elif i >= window:
+            val = values[i - window]
+            if val == val:
+                nobs -= 1
+                y = -val - compensation_remove
+                t = sum_x + y
+                compensation_remove = t - sum_x - y
+                sum_x = t
+                if np.signbit(val):
+                    neg_ct -= 1
+        val = values[i]
+        if val == val:
+            nobs += 1
+            y = val - compensation_add
+            t = sum_x + y
+            compensation_add = t - sum_x - y
+            sum_x = t
+            if np.signbit(val):
+                neg_ct += 1
+            if val == prev_value:
+                same_count += 1
+            else:
+                same_count = 1
+            prev_value = val
+        if nobs >= window and nobs > 0:
+            result = sum_x / nobs
+            if same_count >= nobs:
+                result = prev_value
+            elif neg_ct == 0 and result < 0:
+                result = 0.0
+            elif neg_ct == nobs and result > 0:
+                result = 0.0
+            out[i] = result
+        else:
+            out[i] = np.nan
+    return out
+
+
+def _rsi_sma_batch(close: np.ndarray, rsi_windows: np.ndarray,
+                   ma_windows: np.ndarray, out: np.ndarray):
+    """
+    Computes every RSI and SMA window for one close series into out.
+
+    Gains and losses are derived from the closes once and shared by all RSI
+    windows. Row k of out holds rsi_windows[k], followed by one row per MA
+    window, in the order given.
+    """
+    n = close.shape[0]
+    n_rsi = rsi_windows.shape[0]
+    gains = np.empty(n)
+    losses = np.empty(n)
+    if n > 0:
+        gains[0] = np.nan
+        losses[0] = np.nan
+    for i in range(1, n):
+        change = close[i] - close[i - 1]
+        if change != change:
+            gains[i] = np.nan
+            losses[i] = np.nan
+        else:
+            gains[i] = change if change > 0 else 0.0
+            losses[i] = -change if change < 0 else 0.0
+
+    for k in range(n_rsi):
+        avg_gain = _ewm_mean(gains, rsi_windows[k])
+        avg_loss = _ewm_mean(losses, rsi_windows[k])
+        for i in range(n):
+            total = avg_gain[i] + avg_loss[i]
+            out[k, i] = np.nan if total == 0 else 100.0 * avg_gain[i] / total
+
+    for k in range(ma_windows.shape[0]):
+        out[n_rsi + k] = _rolling_mean(close, ma_windows[k])
+
+
+def _rsi_sma_batch_pandas(close: np.ndarray, rsi_windows: np.ndarray,
+                          ma_windows: np.ndarray, out: np.ndarray):
+    """Fallback for _rsi_sma_batch built on pandas' window functions."""
+    series = pd.Series(close)
+    change = series.diff()
+    gains = change.clip(lower=0)
+    losses = -change.clip(upper=0)
+
+    for k, window in enumerate(rsi_windows):
+        avg_gain = gains.ewm(alpha=1.0 / window, min_periods=window).mean()
+        avg_loss = losses.ewm(alpha=1.0 / window, min_periods=window).mean()
+        out[k] = (100.0 * avg_gain / (avg_gain + avg_loss)).to_numpy()
+
+    for k, window in enumerate(ma_windows):
+        out[len(rsi_windows) + k] = series.rolling(window, min_periods=window).mean().to_numpy()
+
+
+if njit is not None:
+    _ewm_mean = njit(cache=True, nogil=True)(_ewm_mean)
+    _rolling_mean = njit(cache=True, nogil=True)(_rolling_mean)
+    _rsi_sma_batch = njit(cache=True, nogil=True)(_rsi_sma_batch)
+
+
+def rsi_sma_batch(close: np.ndarray, rsi_windows: Sequence[int],
+                  ma_windows: Sequence[int], out: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculates RSI and simple moving averages for several windows at once.
+
+    Args:
+        close (np.ndarray): Closing prices, oldest first. NaNs mark missing days.
+        rsi_windows (Sequence[int]): RSI lookback windows.
+        ma_windows (Sequence[int]): Moving average windows.
+        out (np.ndarray, optional): Array of shape
+            (len(rsi_windows) + len(ma_windows), len(close)) to write the
+            results into, RSI rows first. Values are computed in float64 and
+            cast to out's dtype on store.
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (rsi, ma) arrays of shape
+            (len(windows), len(close)), with NaN during each window's warmup.
+            When out is given these are views of it.
+    """
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    rsi_windows = np.asarray(rsi_windows, dtype=np.int64)
+    ma_windows = np.asarray(ma_windows, dtype=np.int64)
+    n_rsi = len(rsi_windows)
+    shape = (n_rsi + len(ma_windows), len(close))
+    if out is None:
+        out = np.empty(shape)
+    elif out.shape != shape:
+        raise ValueError(f"out has shape {out.shape}, expected {shape}")
+    if njit is None:
+        _rsi_sma_batch_pandas(close, rsi_windows, ma_windows, out)
+    else:
+        _rsi_sma_batch(close, rsi_windows, ma_windows, out)
+    return out[:n_rsi], out[n_rsi:]
@@ -5,14 +5,35 @@ This module provides functionality to scan, parse, and analyze Lisp-style sympho
 for trading strategies. It handles data downloading, indicator calculation, and strategy evaluation.
 """
 
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, reduce
+import numpy as np
 import pandas as pd
 import yfinance as yf
-import pandas_ta as ta
+from yfinance.exceptions import YFException
+from collections import deque
 from typing import Dict, List, Set, Tuple, Union
-from .lisp_parser import parse_symphony_file
-from .composer_parser import ComposerStrategy
+from .lisp_parser import CACHE_DIR, parse_symphony_file
+from .composer_parser import ComposerStrategy, _parse_window
+from .indicators import rsi_sma_batch
 import logging
 logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+logger = logging.getLogger(__name__)
+
+# Node heads whose second element is a ticker symbol
+_TICKER_HEADS = frozenset({'current-price', 'moving-average-price', 'rsi', 'asset'})
+_GROUP_HEAD = 'group'
+
+# Errors a failed download can raise: network errors (requests and curl_cffi
+# errors are OSErrors) and yfinance's own. Anything else is a bug and propagates.
+_DOWNLOAD_ERRORS = (OSError, YFException)
+
+# Price and indicator columns, stored at SymphonyScanner.dtype. Volume and
+# any other field keep the dtype they were downloaded with.
+_PRICE_COLUMNS = re.compile(r'^(Open|High|Low|Close|Adj Close|current_price|RSI_\d+|MA_\d+)$')
 
 
 class SymphonyScanner:
@@ -27,6 +48,27 @@ class SymphonyScanner:
     - Evaluate trading strategies
     """
     
+    # Storage precision of downloaded prices and calculated indicators.
+    # float32 halves the memory and bandwidth of the market data; the
+    # indicator kernels still accumulate in float64.
+    dtype = np.float32
+    
+    # Downloaded frames older than this are fetched again, so that adjusted
+    # prices pick up new dividends and splits.
+    cache_max_age_days = 1
+    
+    # Large ticker lists are downloaded in chunks of this many tickers, on up
+    # to download_workers concurrent requests. Chunks are fetched one after
+    # another by default, because some yfinance releases keep download state
+    # in module globals shared between threads. Raise it only with a yfinance
+    # whose download() is safe to call concurrently.
+    download_chunk_size = 50
+    download_workers = 1
+    
+    # Threads used to calculate indicators. The kernels release the GIL, but
+    # past a handful of threads they mostly compete for memory bandwidth.
+    indicator_workers = min(8, os.cpu_count() or 1)
+    
     def __init__(self, symphony_file_path: str = 'symphony.json'):
         """
         Initialize the SymphonyScanner.
@@ -35,9 +77,107 @@ class SymphonyScanner:
             symphony_file_path (str): Path to the symphony file
         """
         self.symphony_file_path = symphony_file_path
+        self.cache_dir = os.path.join(CACHE_DIR, 'market_data')
         self.all_tickers: Set[str] = set()
         self.all_indicators: Dict = {}
-        self.market_data: Dict[str, pd.DataFrame] = {}
+        self.market_data = {}
+        self._symphony = None
+        self._symphony_key = None
+        self._scanned_symphony = None
+        self._scan_result = None
+    
+    @property
+    def market_data(self) -> Dict[str, pd.DataFrame]:
+        """Market data for each ticker. Assigning it resets the cached date spans."""
+        return self._market_data
+    
+    @market_data.setter
+    def market_data(self, market_data: Dict[str, pd.DataFrame]):
+        self._market_data = market_data
+        for name in ('common_dates', '_date_bounds', 'global_earliest', 'global_latest'):
+            self.__dict__.pop(name, None)
+    
+    @property
+    def all_indicators(self) -> Dict:
+        """Indicators used by the symphony. Assigning it resets the cached window arrays."""
+        return self._all_indicators
+    
+    @all_indicators.setter
+    def all_indicators(self, all_indicators: Dict):
+        self._all_indicators = all_indicators
+        for name in ('rsi_windows', 'ma_windows'):
+            self.__dict__.pop(name, None)
+    
+    def _indicator_windows(self, indicator_type: str) -> np.ndarray:
+        """Return the sorted, unique windows of one indicator type."""
+        windows = {params['window'] for params in self.all_indicators.values()
+                   if params['type'] == indicator_type}
+        return np.array(sorted(windows), dtype=np.int64)
+    
+    @cached_property
+    def rsi_windows(self) -> np.ndarray:
+        """Sorted RSI windows used by the symphony."""
+        return self._indicator_windows('rsi')
+    
+    @cached_property
+    def ma_windows(self) -> np.ndarray:
+        """Sorted moving average windows used by the symphony."""
+        return self._indicator_windows('ma')
+    
+    @property
+    def max_indicator_window(self) -> int:
+        """The longest window of any indicator, or 0 without indicators."""
+        return int(max(self.rsi_windows.max(initial=0), self.ma_windows.max(initial=0)))
+    
+    @cached_property
+    def common_dates(self) -> pd.DatetimeIndex:
+        """Trading dates present for every ticker with data."""
+        # Intersect the sorted index arrays directly, without pandas' per-call
+        # Index overhead
+        indexes = [df.index.values for df in self.market_data.values() if not df.empty]
+        return pd.DatetimeIndex(reduce(np.intersect1d, indexes) if indexes else [])
+    
+    @cached_property
+    def _date_bounds(self) -> np.ndarray:
+        """First and last date of every ticker with data, as a (tickers, 2) datetime64 array."""
+        bounds = np.empty((len(self.market_data), 2), dtype='datetime64[ns]')
+        n = 0
+        for df in self.market_data.values():
+            if df.empty:
+                continue
+            index = df.index
+            if index.is_monotonic_increasing:
+                bounds[n] = index.values[[0, -1]]
+            else:
+                bounds[n] = index.min(), index.max()
+            n += 1
+        return bounds[:n]
+    
+    @cached_property
+    def global_earliest(self) -> Union[pd.Timestamp, None]:
+        """The latest first date across tickers, i.e. when all of them have data."""
+        starts = self._date_bounds[:, 0]
+        return pd.Timestamp(starts.max()) if len(starts) else None
+    
+    @cached_property
+    def global_latest(self) -> Union[pd.Timestamp, None]:
+        """The earliest last date across tickers."""
+        ends = self._date_bounds[:, 1]
+        return pd.Timestamp(ends.min()) if len(ends) else None
+    
+    def _load_symphony(self) -> List:
+        """
+        Parse the symphony file, reusing the previous result while the file is unchanged.
+        
+        Returns:
+            List: The parsed symphony structure
+        """
+        stat = os.stat(self.symphony_file_path)
+        key = (self.symphony_file_path, stat.st_mtime_ns, stat.st_size)
+        if self._symphony is None or self._symphony_key != key:
+            self._symphony = parse_symphony_file(self.symphony_file_path)
+            self._symphony_key = key
+        return self._symphony
     
     def scan_symphony(self) -> Tuple[Set[str], Dict]:
         """
@@ -46,103 +186,169 @@ class SymphonyScanner:
         Returns:
             Tuple[Set[str], Dict]: (tickers, indicators)
         """
-        logging.info("Scanning symphony.json...")
+        logger.info("Scanning symphony.json...")
         
         try:
-            symphony = parse_symphony_file(self.symphony_file_path)
-            logging.info("Symphony parsed successfully")
+            symphony = self._load_symphony()
+            logger.info("Symphony parsed successfully")
             
-            # Extract tickers and indicators
-            self.all_tickers = self._extract_all_tickers(symphony)
-            self.all_indicators = self._extract_all_indicators(symphony)
+            # Extract tickers and indicators in a single walk of the tree. The
+            # walk is only repeated when _load_symphony returns a new parse.
+            if self._scanned_symphony is not symphony:
+                self._scan_result = self._scan_tree(symphony)
+                self._scanned_symphony = symphony
+            tickers, indicators = self._scan_result
+            self.all_tickers, self.all_indicators = set(tickers), dict(indicators)
             
-            logging.info(f"Found {len(self.all_tickers)} tickers: {sorted(self.all_tickers)}")
-            logging.info(f"Found {len(self.all_indicators)} indicator types:")
-            for key, params in self.all_indicators.items():
-                logging.info(f"   - {key}: {params}")
+            logger.info(f"Found {len(self.all_tickers)} tickers: {sorted(self.all_tickers)}")
+            logger.info(f"Found {len(self.all_indicators)} indicator types")
+            if logger.isEnabledFor(logging.DEBUG):
+                for key, params in self.all_indicators.items():
+                    logger.debug(f"   - {key}: {params}")
             
             return self.all_tickers, self.all_indicators
             
         except Exception as e:
-            logging.error(f"Error scanning symphony: {e}")
+            logger.error(f"Error scanning symphony: {e}")
             raise
     
-    def _extract_all_tickers(self, symphony: List) -> Set[str]:
-        """Extract all ticker symbols from the symphony."""
+    def _scan_tree(self, symphony: List) -> Tuple[Set[str], Dict]:
+        """
+        Walk the symphony once, collecting tickers and indicators together.
+        
+        Uses an explicit stack rather than recursion. Children are pushed in
+        reverse so nodes are visited in the same order as a recursive walk.
+        Parsed symphonies only contain plain lists, so nodes are recognised
+        with exact type checks, which skip isinstance's subclass handling.
+        """
         tickers = set()
+        indicators = {}
+        stack = deque([symphony])
+        # Bind the hot methods once instead of looking them up per node
+        pop, push, add_ticker = stack.pop, stack.extend, tickers.add
         
-        def extract_from_expression(expr):
-            if isinstance(expr, list):
-                if len(expr) > 0 and expr[0] in ['current-price', 'moving-average-price', 'rsi']:
-                    if len(expr) > 1 and isinstance(expr[1], str):
-                        tickers.add(expr[1])
-                elif len(expr) > 0 and expr[0] == 'asset':
-                    if len(expr) > 1 and isinstance(expr[1], str):
-                        tickers.add(expr[1])
-                elif len(expr) > 0 and expr[0] == 'group':
-                    if len(expr) > 1 and isinstance(expr[1], str):
-                        # Parse group string like "UVXY+VIXM+BIL+BTAL"
-                        group_tickers = expr[1].split('+')
-                        tickers.update(group_tickers)
-                
-                # Recursively process all elements
-                for item in expr:
-                    extract_from_expression(item)
+        while stack:
+            expr = pop()
+            if type(expr) is not list or not expr:
+                continue
+            
+            head = expr[0]
+            if type(head) is str and head in _TICKER_HEADS:
+                if len(expr) > 1 and isinstance(expr[1], str):
+                    add_ticker(expr[1])
+                if head == 'rsi' and len(expr) > 2:
+                    window = _parse_window(expr[2], 10)
+                    indicators[('rsi', window)] = {'type': 'rsi', 'window': window}
+                elif head == 'moving-average-price' and len(expr) > 2:
+                    window = _parse_window(expr[2], 20)
+                    indicators[('ma', window)] = {'type': 'ma', 'window': window}
+            elif head == _GROUP_HEAD:
+                if len(expr) > 1 and isinstance(expr[1], str):
+                    # Parse group string like "UVXY+VIXM+BIL+BTAL"
+                    tickers.update(expr[1].split('+'))
+            
+            # Only sub-lists can hold tickers, so leaves are never pushed
+            push(item for item in reversed(expr) if type(item) is list)
         
-        extract_from_expression(symphony)
-        return tickers
+        return tickers, indicators
+    
+    def _extract_all_tickers(self, symphony: List) -> Set[str]:
+        """Extract all ticker symbols from the symphony."""
+        return self._scan_tree(symphony)[0]
     
     def _extract_all_indicators(self, symphony: List) -> Dict:
         """Extract all indicator types and their parameters from the symphony."""
-        indicators = {}
-        
-        def extract_from_expression(expr):
-            if isinstance(expr, list):
-                if len(expr) > 0 and expr[0] == 'rsi':
-                    if len(expr) > 2:
-                        params = expr[2]
-                        window = 10  # default
-                        if isinstance(params, dict) and ':window' in params:
-                            window = int(params[':window'])
-                        elif isinstance(params, list):
-                            for i in range(len(params) - 1):
-                                if params[i] == ':window':
-                                    window = int(params[i + 1])
-                                    break
-                        indicators[('rsi', window)] = {'type': 'rsi', 'window': window}
-                
-                elif len(expr) > 0 and expr[0] == 'moving-average-price':
-                    if len(expr) > 2:
-                        params = expr[2]
-                        window = 20  # default
-                        if isinstance(params, dict) and ':window' in params:
-                            window = int(params[':window'])
-                        elif isinstance(params, list):
-                            for i in range(len(params) - 1):
-                                if params[i] == ':window':
-                                    window = int(params[i + 1])
-                                    break
-                        indicators[('ma', window)] = {'type': 'ma', 'window': window}
-                
-                # Recursively process all elements
-                for item in expr:
-                    extract_from_expression(item)
+        return self._scan_tree(symphony)[1]
+    
+    def _cache_path(self, ticker: str, start_date: str, end_date: str) -> str:
+        """Return the Parquet file caching a ticker's download for a date range."""
+        return os.path.join(self.cache_dir, f"{ticker}_{start_date}_{end_date}.parquet")
+    
+    def has_cache(self, ticker: str, start_date: str, end_date: str) -> bool:
+        """
+        Check whether a fresh cached download exists for a ticker and date range.
         
-        extract_from_expression(symphony)
-        return indicators
+        Args:
+            ticker (str): Ticker symbol
+            start_date (str): Download start date
+            end_date (str): Download end date
+        Returns:
+            bool: True if the cached file exists and is younger than cache_max_age_days
+        """
+        try:
+            age = time.time() - os.path.getmtime(self._cache_path(ticker, start_date, end_date))
+        except OSError:
+            return False
+        return age < self.cache_max_age_days * 86400
+    
+    @staticmethod
+    def _write_cache(df: pd.DataFrame, path: str):
+        """Write a frame to the download cache, atomically and best-effort."""
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            df.to_parquet(tmp_path)
+            os.replace(tmp_path, path)
+        except (ImportError, OSError, ValueError):
+            # Parquet support (pyarrow) is optional; run without the cache
+            pass
+    
+    def _cast_prices(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Return df with its price and indicator columns stored at self.dtype."""
+        casts = {col: self.dtype for col in df.columns
+                 if isinstance(col, str) and _PRICE_COLUMNS.match(col) and df[col].dtype != self.dtype}
+        return df.astype(casts) if casts else df
     
-    def download_market_data(self, start_date: str = None, end_date: str = None) -> Dict[str, pd.DataFrame]:
+    def _download(self, tickers: List[str], start_date: str, end_date: str) -> pd.DataFrame:
+        """
+        Download tickers from yfinance, in chunks for large lists, fetched
+        concurrently when download_workers allows it.
+        
+        Chunk results are joined on the union of their dates, exactly as a
+        single request for all tickers would align them. A chunk that fails
+        with a network or yfinance error is logged and skipped, so its
+        tickers come back without data instead of aborting the whole
+        download. This holds for a list that fits in one chunk too.
+        """
+        def fetch_chunk(chunk: List[str]) -> Union[pd.DataFrame, None]:
+            try:
+                return yf.download(chunk, start=start_date, end=end_date, group_by='ticker',
+                                   auto_adjust=True, threads=True, progress=False)
+            except _DOWNLOAD_ERRORS as e:
+                logger.warning(f"   ⚠️  Download failed for {', '.join(chunk)}: {e}")
+                return None
+        
+        size = self.download_chunk_size
+        chunks = [tickers[i:i + size] for i in range(0, len(tickers), size)]
+        if len(chunks) == 1 or self.download_workers <= 1:
+            parts = [fetch_chunk(chunk) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=self.download_workers) as executor:
+                parts = list(executor.map(fetch_chunk, chunks))
+        
+        # Single-ticker chunks may come back with flat columns
+        parts = [part if isinstance(part.columns, pd.MultiIndex) else pd.concat({chunk[0]: part}, axis=1)
+                 for chunk, part in zip(chunks, parts) if part is not None and not part.empty]
+        return pd.concat(parts, axis=1) if parts else pd.DataFrame()
+    
+    def download_market_data(self, start_date: str = None, end_date: str = None,
+                             use_cache: bool = True) -> Dict[str, pd.DataFrame]:
         """
         Download maximum available historical market data for all tickers.
         
+        Each ticker's download is cached as Parquet in cache_dir, keyed by the
+        ticker and date range, and only tickers without a fresh cache entry
+        are requested from yfinance.
+        
         Args:
             start_date (str, optional): Start date for data download. If None, downloads from earliest available.
             end_date (str, optional): End date for data download. If None, downloads to latest available.
+            use_cache (bool): Whether to read and write the on-disk download cache
         Returns:
             Dict[str, pd.DataFrame]: Market data for each ticker
         """
         if not self.all_tickers:
-            logging.warning("No tickers found to download")
+            logger.warning("No tickers found to download")
             return {}
         
         # Set default dates to get maximum available data
@@ -151,37 +357,77 @@ class SymphonyScanner:
         if end_date is None:
             end_date = '2024-12-31'    # Current date
         
-        logging.info(f"Downloading maximum available market data for {len(self.all_tickers)} tickers...")
-        logging.info(f"   Download period: {start_date} to {end_date}")
-        
-        # Download maximum available data using yfinance
-        tickers_list = list(self.all_tickers)
-        data = yf.download(tickers_list, start=start_date, end=end_date, group_by='ticker', auto_adjust=True)
-        
-        # Convert to the expected format
-        market_data = {}
-        for ticker in self.all_tickers:
-            if len(self.all_tickers) == 1:
-                ticker_data = data
-            else:
-                if ticker in data.columns.get_level_values(0):
-                    ticker_data = data[ticker]
+        frames = {}
+        if use_cache:
+            for ticker in self.all_tickers:
+                if self.has_cache(ticker, start_date, end_date):
+                    try:
+                        frames[ticker] = pd.read_parquet(self._cache_path(ticker, start_date, end_date))
+                    except (ImportError, OSError, ValueError):
+                        pass
+        missing = [ticker for ticker in self.all_tickers if ticker not in frames]
+        if frames:
+            logger.info(f"Loaded {len(frames)} tickers from the download cache")
+        
+        if missing:
+            logger.info(f"Downloading maximum available market data for {len(missing)} tickers...")
+            logger.info(f"   Download period: {start_date} to {end_date}")
+            
+            # Download maximum available data using yfinance
+            data = self._download(missing, start_date, end_date)
+            
+            # Convert to the expected format. Group the column positions by
+            # ticker in one pass instead of rescanning the MultiIndex per ticker.
+            multi_index = isinstance(data.columns, pd.MultiIndex)
+            if multi_index:
+                level_values = data.columns.get_level_values(0)
+                groups = pd.Series(np.arange(len(level_values))).groupby(level_values).indices
+            for ticker in missing:
+                if not multi_index:
+                    # Single-ticker downloads may come back with flat columns
+                    ticker_data = data
+                elif ticker in groups:
+                    ticker_data = data.iloc[:, groups[ticker]].droplevel(0, axis=1)
                 else:
-                    logging.warning(f"No data found for {ticker}")
+                    logger.warning(f"No data found for {ticker}")
                     ticker_data = pd.DataFrame()
-            
-            # Keep all data for indicator calculation, but mark the analysis period
-            market_data[ticker] = ticker_data
+                
+                ticker_data = self._cast_prices(ticker_data)
+                if use_cache and not ticker_data.empty:
+                    # Cache only the ticker's own rows; the shared index is rebuilt below
+                    self._write_cache(ticker_data.dropna(how='all'),
+                                      self._cache_path(ticker, start_date, end_date))
+                frames[ticker] = ticker_data
+        
+        # Keep all data for indicator calculation, but mark the analysis period
+        market_data = {ticker: frames[ticker] for ticker in self.all_tickers}
+        
+        # Align cached and freshly downloaded frames on the union of their dates,
+        # as a single download of every ticker would, and let them all share
+        # that one DatetimeIndex object instead of equal per-ticker copies
+        indexes = [df.index for df in market_data.values() if not df.empty]
+        if indexes:
+            dates = indexes[0]
+            for index in indexes[1:]:
+                if not index.equals(dates):
+                    dates = dates.union(index)
+            for ticker, df in market_data.items():
+                if df.empty or df.index is dates:
+                    continue
+                if df.index.equals(dates):
+                    df.index = dates
+                else:
+                    market_data[ticker] = df.reindex(dates)
         
         self.market_data = market_data
-        logging.info(f"Downloaded data for {len(market_data)} tickers")
+        logger.info(f"Downloaded data for {len(market_data)} tickers")
         
-        # Print data summary
+        # Log data summary
         for ticker, df in market_data.items():
-            if not df.empty:
-                logging.info(f"   {ticker}: {df.shape[0]} days, {df.shape[1]} columns")
-            else:
-                logging.warning(f"   {ticker}: No data")
+            if df.empty:
+                logger.warning(f"   {ticker}: No data")
+            elif logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"   {ticker}: {df.shape[0]} days, {df.shape[1]} columns")
         return market_data
     
     def determine_max_analysis_length(self) -> Tuple[str, str]:
@@ -192,33 +438,18 @@ class SymphonyScanner:
             Tuple[str, str]: (start_date, end_date) for maximum analysis period
         """
         if not self.market_data:
-            logging.warning("No market data available. Run download_market_data first.")
-            return None, None
-        
-        # Find the earliest and latest dates across all tickers
-        earliest_dates = []
-        latest_dates = []
-        
-        for ticker, df in self.market_data.items():
-            if not df.empty:
-                earliest_dates.append(df.index.min())
-                latest_dates.append(df.index.max())
-        
-        if not earliest_dates or not latest_dates:
-            logging.warning("No valid data found in market_data")
+            logger.warning("No market data available. Run download_market_data first.")
             return None, None
         
         # Get the latest earliest date and earliest latest date (intersection)
-        global_earliest = max(earliest_dates)  # Latest of earliest dates
-        global_latest = min(latest_dates)      # Earliest of latest dates
+        global_earliest = self.global_earliest
+        global_latest = self.global_latest
+        if global_earliest is None or global_latest is None:
+            logger.warning("No valid data found in market_data")
+            return None, None
         
         # Calculate required warmup based on indicators
-        max_window = 0
-        for indicator_key, params in self.all_indicators.items():
-            if params['type'] == 'rsi':
-                max_window = max(max_window, params['window'])
-            elif params['type'] == 'ma':
-                max_window = max(max_window, params['window'])
+        max_window = self.max_indicator_window
         
         # Add buffer for warmup (extra days beyond the max window)
         warmup_buffer = 100  # Extra days for safety
@@ -230,18 +461,18 @@ class SymphonyScanner:
         
         # Ensure we have enough data
         if analysis_start >= analysis_end:
-            logging.warning(f"Insufficient data for analysis. Need at least {required_warmup} days of warmup.")
+            logger.warning(f"Insufficient data for analysis. Need at least {required_warmup} days of warmup.")
             return None, None
         
         start_date_str = analysis_start.strftime('%Y-%m-%d')
         end_date_str = analysis_end.strftime('%Y-%m-%d')
         
-        logging.info(f"Maximum analysis period determined:")
-        logging.info(f"   Data available: {global_earliest.strftime('%Y-%m-%d')} to {global_latest.strftime('%Y-%m-%d')}")
-        logging.info(f"   Max indicator window: {max_window} days")
-        logging.info(f"   Required warmup: {required_warmup} days")
-        logging.info(f"   Analysis period: {start_date_str} to {end_date_str}")
-        logging.info(f"   Total analysis days: {(analysis_end - analysis_start).days} days")
+        logger.info(f"Maximum analysis period determined:")
+        logger.info(f"   Data available: {global_earliest.strftime('%Y-%m-%d')} to {global_latest.strftime('%Y-%m-%d')}")
+        logger.info(f"   Max indicator window: {max_window} days")
+        logger.info(f"   Required warmup: {required_warmup} days")
+        logger.info(f"   Analysis period: {start_date_str} to {end_date_str}")
+        logger.info(f"   Total analysis days: {(analysis_end - analysis_start).days} days")
         
         return start_date_str, end_date_str
     
@@ -252,49 +483,63 @@ class SymphonyScanner:
         Returns:
             Dict[str, pd.DataFrame]: Market data with indicators added
         """
-        logging.info("Calculating technical indicators for ALL tickers...")
+        logger.info("Calculating technical indicators for ALL tickers...")
         
         # Get all unique indicator parameters
-        all_rsi_windows = set()
-        all_ma_windows = set()
-        
-        for indicator_key, params in self.all_indicators.items():
-            if params['type'] == 'rsi':
-                all_rsi_windows.add(params['window'])
-            elif params['type'] == 'ma':
-                all_ma_windows.add(params['window'])
-        
-        logging.info(f"   RSI windows: {sorted(all_rsi_windows)}")
-        logging.info(f"   MA windows: {sorted(all_ma_windows)}")
-        
-        # Calculate indicators for each ticker
-        for ticker, df in self.market_data.items():
-            if df.empty:
-                continue
-                
-            logging.info(f"   Calculating indicators for {ticker}...")
-            
-            # Calculate RSI for all windows
-            for window in all_rsi_windows:
-                rsi_col = f'RSI_{window}'
-                df[rsi_col] = ta.rsi(df['Close'], length=window)
+        rsi_windows = self.rsi_windows
+        ma_windows = self.ma_windows
+        
+        logger.info(f"   RSI windows: {rsi_windows.tolist()}")
+        logger.info(f"   MA windows: {ma_windows.tolist()}")
+        
+        # Calculate indicators for each ticker. The kernels release the GIL,
+        # so tickers are processed concurrently on a thread pool.
+        tickers = [ticker for ticker, df in self.market_data.items() if not df.empty]
+        with ThreadPoolExecutor(max_workers=self.indicator_workers) as executor:
+            results = executor.map(
+                lambda ticker: self._calculate_ticker_indicators(ticker, rsi_windows, ma_windows), tickers)
+            for ticker, df in zip(tickers, results):
+                self.market_data[ticker] = df
             
-            # Calculate moving averages for all windows
-            for window in all_ma_windows:
-                ma_col = f'MA_{window}'
-                df[ma_col] = ta.sma(df['Close'], length=window)
-            
-            # Add current price column
-            df['current_price'] = df['Close']
-            
-            # Forward fill NaN values
-            df = df.ffill()
-            
-            self.market_data[ticker] = df
-            
-        logging.info("All indicators calculated")
+        logger.info("All indicators calculated")
         return self.market_data
     
+    def _calculate_ticker_indicators(self, ticker: str, rsi_windows: np.ndarray,
+                                     ma_windows: np.ndarray) -> pd.DataFrame:
+        """
+        Calculate the indicators of one ticker.
+        
+        Args:
+            ticker (str): Ticker symbol
+            rsi_windows (np.ndarray): RSI windows to calculate
+            ma_windows (np.ndarray): Moving average windows to calculate
+        Returns:
+            pd.DataFrame: The ticker's market data with indicator columns added
+        """
+        logger.debug(f"   Calculating indicators for {ticker}...")
+        df = self.market_data[ticker]
+        
+        df = self._cast_prices(df)
+        
+        # Calculate every RSI and MA window in one fused pass over the closes,
+        # straight into one preallocated (columns, dates) block, which
+        # becomes the indicator frame without further copies
+        close = df['Close'].to_numpy(dtype=np.float64)
+        block = np.empty((len(rsi_windows) + len(ma_windows) + 1, len(close)), dtype=self.dtype)
+        rsi_sma_batch(close, rsi_windows, ma_windows, out=block[:-1])
+        block[-1] = close
+        
+        # Attach all indicators (and the current price column) as one block
+        # rather than inserting them column by column
+        indicator_columns = ([f'RSI_{window}' for window in rsi_windows] +
+                             [f'MA_{window}' for window in ma_windows] + ['current_price'])
+        indicators = pd.DataFrame(block.T, index=df.index, columns=indicator_columns, copy=False)
+        df = pd.concat([df.drop(columns=indicator_columns, errors='ignore'), indicators], axis=1)
+        
+        # Forward fill NaN values
+        df.ffill(inplace=True)
+        return df
+    
     def create_strategy_evaluator(self) -> ComposerStrategy:
         """
         Create a strategy evaluator from the parsed symphony.
@@ -302,10 +547,10 @@ class SymphonyScanner:
         Returns:
             ComposerStrategy: Strategy evaluator
         """
-        logging.info("Creating strategy evaluator...")
+        logger.info("Creating strategy evaluator...")
         
-        # Parse the symphony file
-        symphony = parse_symphony_file(self.symphony_file_path)
+        # Reuse the symphony parsed by scan_symphony when the file is unchanged
+        symphony = self._load_symphony()
         
         # Find the main strategy logic (weight-equal expression)
         strategy_logic = None
@@ -324,17 +569,9 @@ class SymphonyScanner:
             strategy_logic  # strategy logic
         ]
         
-        logging.debug("Symphony structure type:", type(symphony_json))
-        logging.debug("Symphony length:", len(symphony_json))
-        logging.debug("First element:", symphony_json[0])
-        logging.debug("Second element:", symphony_json[1])
-        logging.debug("Third element type:", type(symphony_json[2]))
-        logging.debug("Found strategy logic at index 10:", symphony_json[2][0])
-        logging.debug("Fixed symphony structure:", [type(item) for item in symphony_json])
-        
         # Create the strategy evaluator
         strategy = ComposerStrategy(symphony_json, self.market_data)
-        logging.info("Strategy evaluator created")
+        logger.info("Strategy evaluator created")
         
         return strategy
     
@@ -350,53 +587,72 @@ class SymphonyScanner:
         Returns:
             List[Dict]: Daily ticker selections
         """
-        logging.info(f"Getting daily ticker selections from {start_date} to {end_date}...")
+        logger.info(f"Getting daily ticker selections from {start_date} to {end_date}...")
         
         # Get common dates across all tickers
-        common_dates = None
-        for ticker, df in self.market_data.items():
-            if not df.empty:
-                if common_dates is None:
-                    common_dates = df.index
-                else:
-                    common_dates = common_dates.intersection(df.index)
+        common_dates = self.common_dates
         
-        if common_dates is None or len(common_dates) == 0:
-            logging.warning("No common dates found across tickers")
+        if len(common_dates) == 0:
+            logger.warning("No common dates found across tickers")
             return []
         
-        # Filter to the requested date range
-        start_dt = pd.to_datetime(start_date)
-        end_dt = pd.to_datetime(end_date)
-        date_range = common_dates[(common_dates >= start_dt) & (common_dates <= end_dt)]
+        # Filter to the requested date range. common_dates is sorted, so the
+        # bounds are found by bisection instead of two full comparison masks.
+        lo = common_dates.searchsorted(pd.to_datetime(start_date), side='left')
+        hi = common_dates.searchsorted(pd.to_datetime(end_date), side='right')
+        date_range = common_dates[lo:hi]
         
-        logging.info(f"   Evaluating {len(date_range)} trading days...")
+        logger.info(f"   Evaluating {len(date_range)} trading days...")
+        
+        # Evaluate every date in one vectorized pass; dates the batch cannot
+        # handle go through the per-day evaluator, which reports their errors.
+        try:
+            weights, assets, failed = strategy.get_target_portfolios_batch(date_range)
+        except Exception as e:
+            logger.warning(f"   ⚠️  Batch evaluation failed, evaluating day by day: {e}")
+            weights, assets, failed = None, [], np.ones(len(date_range), dtype=bool)
+        
+        # Format all dates in one vectorized call instead of once per day
+        date_strs = date_range.strftime('%Y-%m-%d').tolist()
+        
+        # Locate the selected assets of every day with one nonzero over the
+        # whole weight matrix. Its row-major output lists each day's assets
+        # contiguously, and bounds[i]:bounds[i + 1] delimits day i.
+        if weights is not None:
+            rows, cols = np.nonzero(weights > 0)
+            selected_names = np.asarray(assets, dtype=object)[cols].tolist()
+            selected_weights = weights[rows, cols].tolist()
+            bounds = np.searchsorted(rows, np.arange(len(date_range) + 1)).tolist()
         
         daily_selections = []
         for i, date in enumerate(date_range):
             try:
-                target_portfolio = strategy.get_target_portfolio(date)
-                selected_tickers = {ticker: weight for ticker, weight in target_portfolio.items() if weight > 0}
+                if failed[i]:
+                    target_portfolio = strategy.get_target_portfolio(date)
+                    selected_tickers = {ticker: weight for ticker, weight in target_portfolio.items() if weight > 0}
+                else:
+                    lo, hi = bounds[i], bounds[i + 1]
+                    selected_tickers = dict(zip(selected_names[lo:hi], selected_weights[lo:hi]))
                 
                 daily_selections.append({
-                    'date': date.strftime('%Y-%m-%d'),
+                    'date': date_strs[i],
                     'selected_tickers': selected_tickers,
                     'total_weight': sum(selected_tickers.values())
                 })
                 
-                if i < 5:  # Show first 5 days for debugging
-                    logging.debug(f"   {date.strftime('%Y-%m-%d')}: {selected_tickers}")
+                if i < 5 and logger.isEnabledFor(logging.DEBUG):  # Show first 5 days for debugging
+                    logger.debug(f"   {date_strs[i]}: {selected_tickers}")
                     
             except Exception as e:
-                logging.warning(f"   ⚠️  Error on {date.strftime('%Y-%m-%d')}: {e}")
+                logger.warning(f"   ⚠️  Error on {date_strs[i]}: {e}")
                 daily_selections.append({
-                    'date': date.strftime('%Y-%m-%d'),
+                    'date': date_strs[i],
                     'selected_tickers': {},
                     'total_weight': 0,
                     'error': str(e)
                 })
         
-        logging.info(f"Generated {len(daily_selections)} daily selections")
+        logger.info(f"Generated {len(daily_selections)} daily selections")
         return daily_selections
     
     def run_complete_analysis(self, start_date: str = None, end_date: str = None) -> Dict:
@@ -410,7 +666,7 @@ class SymphonyScanner:
         Returns:
             Dict: Complete analysis results
         """
-        logging.info("Starting complete symphony analysis with maximum data...")
+        logger.info("Starting complete symphony analysis with maximum data...")
         
         # Step 1: Scan symphony
         tickers, indicators = self.scan_symphony()
@@ -425,7 +681,7 @@ class SymphonyScanner:
         if start_date is None or end_date is None:
             start_date, end_date = self.determine_max_analysis_length()
             if start_date is None or end_date is None:
-                logging.error("Failed to determine analysis period")
+                logger.error("Failed to determine analysis period")
                 return {}
         
         # Step 5: Create strategy evaluator
@@ -453,5 +709,5 @@ class SymphonyScanner:
             'total_days_analyzed': len(daily_selections)
         }
         
-        logging.info("Complete analysis finished!")
+        logger.info("Complete analysis finished!")
         return results 
\ No newline at end of file
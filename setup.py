@@ -68,6 +68,12 @@ setup(
             "mypy>=1.0.0",
             "pre-commit>=2.20.0",
         ],
+        "fast": [
+            "numba>=0.57.0",
+        ],
+        "cache": [
+            "pyarrow>=10.0.0",
+        ],
         "docs": [
             "sphinx>=5.0.0",
             "sphinx-rtd-theme>=1.0.0",
@@ -0,0 +1,34 @@
+"""
+Shared pytest configuration.
+
+Tests marked ``slow`` (the network-bound integration test) are skipped unless
+pytest is run with ``--runslow``. Every test gets its own on-disk cache
+directory, so the suite never reads or writes the user's ~/.cache.
+"""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Points the parse and download caches at a per-test directory."""
+    from composer_parser import lisp_parser, symphony_scanner
+
+    cache_dir = str(tmp_path / 'composer_parser_cache')
+    monkeypatch.setattr(lisp_parser, 'CACHE_DIR', cache_dir)
+    monkeypatch.setattr(symphony_scanner, 'CACHE_DIR', cache_dir)
+    return cache_dir
+
+
+def pytest_addoption(parser):
+    parser.addoption("--runslow", action="store_true", default=False,
+                     help="run tests marked as slow")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--runslow"):
+        return
+    skip_slow = pytest.mark.skip(reason="slow test; use --runslow to run")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
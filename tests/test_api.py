@@ -0,0 +1,37 @@
+"""
+Tests for the high-level ComposerAPI.
+"""
+
+import numpy as np
+import pandas as pd
+from composer_parser.api import ComposerAPI
+
+
+class TestComposerAPI:
+    """Test cases for ComposerAPI."""
+
+    def test_get_market_data_filters_dates(self):
+        """Test that date filters match inclusive label bounds on sorted and unsorted frames."""
+        api = ComposerAPI('symphony.json')
+        spy = pd.DataFrame({'Close': np.arange(10.0)}, index=pd.date_range('2024-01-01', periods=10))
+        api._market_data = {'SPY': spy, 'TLT': spy.iloc[::-1], 'EMPTY': pd.DataFrame()}
+
+        expected = spy.loc['2024-01-03':'2024-01-06']
+        pd.testing.assert_frame_equal(api.get_market_data('SPY', '2024-01-03', '2024-01-06'), expected)
+        pd.testing.assert_frame_equal(api.get_market_data('TLT', '2024-01-03', '2024-01-06').sort_index(),
+                                      expected, check_freq=False)
+        assert len(api.get_market_data('SPY', start_date='2024-01-08')) == 3
+        assert len(api.get_market_data('SPY', end_date='2023-12-31')) == 0
+        assert api.get_market_data('EMPTY', '2024-01-03').empty
+
+    def test_get_market_data_returns_independent_copy(self):
+        """Test that writing to a filtered result leaves the loaded market data unchanged."""
+        api = ComposerAPI('symphony.json')
+        spy = pd.DataFrame({'Close': np.arange(10.0)}, index=pd.date_range('2024-01-01', periods=10))
+        api._market_data = {'SPY': spy}
+
+        result = api.get_market_data('SPY', '2024-01-03', '2024-01-06')
+        result.iloc[0, 0] = -1.0
+        result['Close'] *= 100
+
+        assert spy['Close'].tolist() == list(np.arange(10.0))
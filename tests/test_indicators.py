@@ -0,0 +1,66 @@
+"""
+Tests for the indicator kernels.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from composer_parser import indicators
+
+
+def reference_rsi(close: pd.Series, window: int) -> pd.Series:
+    """Wilder RSI with the adjusted-EWM rma of pandas-ta 0.3.x."""
+    change = close.diff()
+    avg_gain = change.clip(lower=0).ewm(alpha=1.0 / window, min_periods=window).mean()
+    avg_loss = change.clip(upper=0).ewm(alpha=1.0 / window, min_periods=window).mean().abs()
+    return 100 * avg_gain / (avg_gain + avg_loss)
+
+
+def sample_close(length: int = 500) -> np.ndarray:
+    """Random-walk closes with a missing prefix and a gap, like a yfinance download."""
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(42).normal(0, 0.02, length)))
+    close[:25] = np.nan
+    close[300:303] = np.nan
+    return close
+
+
+class TestRsiSmaBatch:
+    """Test cases for rsi_sma_batch."""
+
+    @pytest.mark.parametrize("use_numba", [True, False])
+    def test_matches_pandas_reference(self, monkeypatch, use_numba):
+        """Test that RSI and SMA match pandas' window functions exactly."""
+        if use_numba and indicators.njit is None:
+            pytest.skip("numba not installed")
+        if not use_numba:
+            monkeypatch.setattr(indicators, 'njit', None)
+
+        close = sample_close()
+        rsi, ma = indicators.rsi_sma_batch(close, [2, 10, 14], [1, 20, 200])
+
+        series = pd.Series(close)
+        for row, window in enumerate([2, 10, 14]):
+            np.testing.assert_array_equal(rsi[row], reference_rsi(series, window).to_numpy())
+        for row, window in enumerate([1, 20, 200]):
+            np.testing.assert_array_equal(ma[row], series.rolling(window).mean().to_numpy())
+
+    def test_output_shape_and_warmup(self):
+        """Test output layout and that warmup rows are NaN."""
+        rsi, ma = indicators.rsi_sma_batch(np.arange(1.0, 51.0), [10], [20, 30])
+
+        assert rsi.shape == (1, 50)
+        assert ma.shape == (2, 50)
+        assert np.isnan(rsi[0, :10]).all() and not np.isnan(rsi[0, 10:]).any()
+        assert np.isnan(ma[1, :29]).all() and ma[1, 29] == pytest.approx(15.5)
+
+    def test_writes_into_out(self):
+        """Test that results are stored into a caller-provided array, cast to its dtype."""
+        close = sample_close()
+        rsi, ma = indicators.rsi_sma_batch(close, [10, 14], [20])
+        out = np.empty((3, len(close)), dtype=np.float32)
+        rsi_view, ma_view = indicators.rsi_sma_batch(close, [10, 14], [20], out=out)
+
+        assert np.shares_memory(rsi_view, out) and np.shares_memory(ma_view, out)
+        np.testing.assert_array_equal(out, np.vstack([rsi, ma]).astype(np.float32))
+        with pytest.raises(ValueError):
+            indicators.rsi_sma_batch(close, [10], [20], out=out)
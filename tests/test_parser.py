@@ -5,7 +5,8 @@ Tests for the ComposerStrategy parser functionality.
 import pytest
 import pandas as pd
 from unittest.mock import Mock, patch
-from composer_parser.composer_parser import ComposerStrategy
+from composer_parser.composer_parser import ComposerStrategy, _parse_window
+import importlib.util
 import os
 import numpy as np
 import logging
@@ -13,49 +14,92 @@ import pytest
 from composer_parser.symphony_scanner import SymphonyScanner
 
 
-class TestComposerStrategy:
-    """Test cases for ComposerStrategy class."""
+@pytest.fixture(scope="module")
+def sample_data():
+    """Sample market data with correct indicator column names, built once per module."""
+    return {
+        'SPY': pd.DataFrame({
+            'Close': [100, 101, 102, 103, 104],
+            'RSI_10': [50, 51, 52, 53, 54],
+            'MA_200': [98, 99, 100, 101, 102],
+            'current_price': [100, 101, 102, 103, 104]
+        }, index=pd.date_range('2024-01-01', periods=5, freq='D')),
+        'TQQQ': pd.DataFrame({
+            'Close': [50, 51, 52, 53, 54],
+            'RSI_10': [45, 46, 47, 48, 49],
+            'MA_20': [49, 50, 51, 52, 53],
+            'current_price': [50, 51, 52, 53, 54]
+        }, index=pd.date_range('2024-01-01', periods=5, freq='D'))
+    }
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        # Create sample market data with correct indicator column names
-        self.sample_data = {
-            'SPY': pd.DataFrame({
-                'Close': [100, 101, 102, 103, 104],
-                'RSI_10': [50, 51, 52, 53, 54],
-                'MA_200': [98, 99, 100, 101, 102],
-                'current_price': [100, 101, 102, 103, 104]
-            }, index=pd.date_range('2024-01-01', periods=5, freq='D')),
-            'TQQQ': pd.DataFrame({
-                'Close': [50, 51, 52, 53, 54],
-                'RSI_10': [45, 46, 47, 48, 49],
-                'MA_20': [49, 50, 51, 52, 53],
-                'current_price': [50, 51, 52, 53, 54]
-            }, index=pd.date_range('2024-01-01', periods=5, freq='D'))
-        }
 
-        # Create sample symphony JSON
-        self.sample_symphony = [
-            "defsymphony",
-            "Test Strategy",
-            [
-                "if",
-                [">", ["current-price", "SPY"], ["moving-average-price", "SPY", {":window": 200}]],
-                [["asset", "TQQQ", "Test Asset"]],
-                [["asset", "SPY", "Test Asset 2"]]
-            ]
+@pytest.fixture(scope="module")
+def sample_symphony():
+    """Sample symphony JSON."""
+    return [
+        "defsymphony",
+        "Test Strategy",
+        [
+            "if",
+            [">", ["current-price", "SPY"], ["moving-average-price", "SPY", {":window": 200}]],
+            [["asset", "TQQQ", "Test Asset"]],
+            [["asset", "SPY", "Test Asset 2"]]
         ]
+    ]
+
+
+@pytest.fixture(scope="module")
+def base_strategy(sample_symphony, sample_data):
+    """ComposerStrategy over the sample data, shared by tests that only read from it."""
+    return ComposerStrategy(sample_symphony, sample_data)
+
 
-    def test_strategy_initialization(self):
+class TestComposerStrategy:
+    """Test cases for ComposerStrategy class."""
+
+    @pytest.fixture(autouse=True)
+    def set_up(self, sample_data, sample_symphony):
+        """Set up test fixtures. ComposerStrategy never modifies them, so they are shared."""
+        self.sample_data = sample_data
+        self.sample_symphony = sample_symphony
+
+    def test_strategy_initialization(self, base_strategy):
         """Test that ComposerStrategy initializes correctly."""
-        strategy = ComposerStrategy(self.sample_symphony, self.sample_data)
+        strategy = base_strategy
         assert strategy is not None
         assert hasattr(strategy, 'symphony')
         assert hasattr(strategy, 'market_data')
 
-    def test_get_target_portfolio_basic(self):
-        """Test basic portfolio calculation."""
+    def test_indicator_columns_downcast_to_float32(self):
+        """Test that indicator and price columns are stored as float32 in copies of the data."""
+        original_dtypes = {symbol: df.dtypes.copy() for symbol, df in self.sample_data.items()}
         strategy = ComposerStrategy(self.sample_symphony, self.sample_data)
+        for df in strategy.market_data.values():
+            for col in df.columns:
+                assert df[col].dtype == np.float32, f"{col} is {df[col].dtype}"
+        for symbol, df in self.sample_data.items():
+            pd.testing.assert_series_equal(df.dtypes, original_dtypes[symbol])
+
+    def test_column_cache_follows_market_data(self):
+        """Test that replacing market data or a single frame is seen by later evaluations."""
+        symphony = ["defsymphony", "Price Test",
+                    ["if", [">", ["current-price", "SPY"], 150], [["asset", "TQQQ", "High"]],
+                     [["asset", "SPY", "Low"]]]]
+        strategy = ComposerStrategy(symphony, self.sample_data)
+        date = pd.Timestamp('2024-01-03')
+        assert strategy.get_target_portfolio(date) == {'SPY': 1.0}
+
+        high = {symbol: df.copy() for symbol, df in self.sample_data.items()}
+        high['SPY']['Close'] = 200.0
+        strategy.market_data = high
+        assert strategy.get_target_portfolio(date) == {'TQQQ': 1.0}
+
+        strategy.market_data['SPY'] = self.sample_data['SPY']
+        assert strategy.get_target_portfolio(date) == {'SPY': 1.0}
+
+    def test_get_target_portfolio_basic(self, base_strategy):
+        """Test basic portfolio calculation."""
+        strategy = base_strategy
         date = pd.Timestamp('2024-01-03')
         
         portfolio = strategy.get_target_portfolio(date)
@@ -65,9 +109,9 @@ class TestComposerStrategy:
         assert all(isinstance(k, str) for k in portfolio.keys())
         assert all(isinstance(v, (int, float)) for v in portfolio.values())
 
-    def test_get_target_portfolio_weights_sum_to_one(self):
+    def test_get_target_portfolio_weights_sum_to_one(self, base_strategy):
         """Test that portfolio weights sum to approximately 1.0."""
-        strategy = ComposerStrategy(self.sample_symphony, self.sample_data)
+        strategy = base_strategy
         date = pd.Timestamp('2024-01-03')
         
         portfolio = strategy.get_target_portfolio(date)
@@ -75,9 +119,9 @@ class TestComposerStrategy:
         
         assert abs(total_weight - 1.0) < 0.01, f"Weights sum to {total_weight}, expected 1.0"
 
-    def test_get_target_portfolio_with_missing_data(self):
+    def test_get_target_portfolio_with_missing_data(self, base_strategy):
         """Test handling of missing market data."""
-        strategy = ComposerStrategy(self.sample_symphony, self.sample_data)
+        strategy = base_strategy
         date = pd.Timestamp('2024-01-03')
         
         # This should not raise an exception
@@ -156,6 +200,87 @@ class TestComposerStrategy:
         assert isinstance(portfolio, dict)
         assert len(portfolio) > 0
 
+    def test_filter_operator_ranks_by_indicator(self):
+        """Test that filter picks the top and bottom assets by indicator value."""
+        def make_filter(method):
+            return [
+                "defsymphony",
+                "Filter Ranking Test",
+                [
+                    "filter",
+                    ["rsi", {":window": 10}],
+                    [method, 1],
+                    [
+                        ["asset", "SPY", "Asset 1"],
+                        ["asset", "TQQQ", "Asset 2"]
+                    ]
+                ]
+            ]
+
+        date = pd.Timestamp('2024-01-03')
+        top = ComposerStrategy(make_filter("select-top"), self.sample_data).get_target_portfolio(date)
+        bottom = ComposerStrategy(make_filter("select-bottom"), self.sample_data).get_target_portfolio(date)
+
+        assert top == {'SPY': 1.0}
+        assert bottom == {'TQQQ': 1.0}
+
+    @pytest.mark.parametrize("method, expected", [
+        ("select-top", ['SPY', 'TQQQ', 'NANQ']),
+        ("select-bottom", ['TQQQ', 'SPY', 'NANQ']),
+    ])
+    def test_filter_ranks_nan_scores_last(self, method, expected):
+        """Test that NaN indicator values rank after real ones, in asset-list order."""
+        index = pd.date_range('2024-01-01', periods=3, freq='D')
+        market_data = {
+            symbol: pd.DataFrame({'Close': 1.0, 'RSI_10': rsi, 'current_price': 1.0}, index=index)
+            for symbol, rsi in [('NANQ', np.nan), ('SPY', 50.0), ('TLT', np.nan), ('TQQQ', 40.0)]
+        }
+        symphony = [
+            "defsymphony",
+            "NaN Filter Test",
+            ["filter", ["rsi", {":window": 10}], [method, 3],
+             [["asset", symbol, symbol] for symbol in ['NANQ', 'SPY', 'TLT', 'TQQQ']]]
+        ]
+        strategy = ComposerStrategy(symphony, market_data)
+        date = pd.Timestamp('2024-01-02')
+
+        portfolio = strategy.get_target_portfolio(date)
+        weights, assets, _ = strategy.get_target_portfolios_batch(pd.DatetimeIndex([date]))
+
+        assert portfolio == pytest.approx({symbol: 1 / 3 for symbol in expected})
+        assert list(portfolio) == expected
+        assert {asset: weights[0, j] for j, asset in enumerate(assets) if weights[0, j] > 0} == \
+            pytest.approx(portfolio)
+
+    def test_batch_matches_per_day_evaluation(self):
+        """Test that batch evaluation agrees with get_target_portfolio on every date."""
+        symphony = [
+            "defsymphony",
+            "Batch Test",
+            [
+                "if",
+                [">", ["rsi", "SPY", {":window": 10}], 51.5],
+                ["filter", ["rsi", {":window": 10}], ["select-bottom", 1],
+                 [["asset", "SPY", "Asset 1"], ["asset", "TQQQ", "Asset 2"]]],
+                ["weight-equal", [["asset", "SPY", "Asset 1"], ["asset", "TQQQ", "Asset 2"]]]
+            ]
+        ]
+        strategy = ComposerStrategy(symphony, self.sample_data)
+        dates = pd.date_range('2023-12-30', '2024-01-07', freq='D')
+
+        weights, assets, failed = strategy.get_target_portfolios_batch(dates)
+
+        assert weights.shape == (len(dates), len(assets))
+        for i, date in enumerate(dates):
+            if date < pd.Timestamp('2024-01-01'):
+                assert failed[i]
+                with pytest.raises(ValueError):
+                    strategy.get_target_portfolio(date)
+                continue
+            assert not failed[i]
+            batch = {asset: weights[i, j] for j, asset in enumerate(assets) if weights[i, j] > 0}
+            assert batch == pytest.approx(strategy.get_target_portfolio(date))
+
     def test_invalid_symphony_format(self):
         """Test handling of invalid symphony format."""
         invalid_symphony = ["invalid", "format"]
@@ -171,9 +296,9 @@ class TestComposerStrategy:
         with pytest.raises(ValueError):
             strategy.get_target_portfolio(date)
 
-    def test_date_out_of_range(self):
+    def test_date_out_of_range(self, base_strategy):
         """Test handling of dates outside available data range."""
-        strategy = ComposerStrategy(self.sample_symphony, self.sample_data)
+        strategy = base_strategy
         date = pd.Timestamp('2020-01-01')  # Date before available data
         
         with pytest.raises(ValueError):
@@ -206,6 +331,131 @@ class TestParserEdgeCases:
         assert strategy is not None
 
 
+@pytest.mark.parametrize("params,expected", [
+    ({':window': 14}, 14),
+    ({':other': 1}, 20),
+    ([':window', 200], 200),
+    ([':period', 5, ':window', 50], 50),
+    ([':window'], 20),
+    ([], 20),
+    (None, 20),
+])
+def test_parse_window(params, expected):
+    """Test :window parsing for dict, flat-list and missing parameters."""
+    assert _parse_window(params, 20) == expected
+
+
+@pytest.mark.parametrize("indicator_type,params,expected", [
+    ('rsi', {':window': 14}, 'RSI_14'),
+    ('rsi', [':window', 14], 'RSI_14'),
+    ('rsi', {}, 'RSI_10'),
+    ('moving-average-price', [':window', 200], 'MA_200'),
+    ('moving-average-price', {':window': 'long'}, None),
+    ('rsi', [':window', None], None),
+    ('current-price', [':window', 5], 'current_price'),
+    ('stdev', {':window': 5}, None),
+])
+def test_indicator_column_parses_dict_and_list_params(indicator_type, params, expected):
+    """Test that filter indicator columns read :window like the rest of the evaluator."""
+    strategy = ComposerStrategy(["defsymphony", "Test", ["asset", "SPY", "SPY"]], {})
+    assert strategy._indicator_column(indicator_type, params) == expected
+
+
+def test_filter_accepts_list_form_window():
+    """Test that a filter whose params parse to a flat list still ranks its assets."""
+    index = pd.date_range('2024-01-01', periods=3, freq='D')
+    market_data = {
+        symbol: pd.DataFrame({'Close': 1.0, 'RSI_14': rsi, 'current_price': 1.0}, index=index)
+        for symbol, rsi in [('SPY', 50.0), ('TQQQ', 40.0)]
+    }
+    symphony = [
+        "defsymphony",
+        "List Window Filter",
+        ["filter", ["rsi", "", [":window", 14]], ["select-bottom", 1],
+         [["asset", "SPY", "SPY"], ["asset", "TQQQ", "TQQQ"]]]
+    ]
+    strategy = ComposerStrategy(symphony, market_data)
+    assert strategy.get_target_portfolio(pd.Timestamp('2024-01-02')) == {'TQQQ': 1.0}
+
+
+def test_parse_symphony_file_uses_content_cache(tmp_path, monkeypatch):
+    """Test that parsed symphonies are cached on disk and reused."""
+    from composer_parser import lisp_parser
+
+    monkeypatch.setattr(lisp_parser, 'CACHE_DIR', str(tmp_path / 'cache'))
+    symphony_file = tmp_path / 'symphony.json'
+    symphony_file.write_text('(defsymphony "Test" {} (weight-equal [(asset "SPY" "SPY")]))')
+
+    first = lisp_parser.parse_symphony_file(str(symphony_file))
+    assert len(list((tmp_path / 'cache').glob('*.pkl'))) == 1
+
+    with patch.object(lisp_parser.LispParser, 'parse', side_effect=AssertionError("re-parsed")):
+        second = lisp_parser.parse_symphony_file(str(symphony_file))
+    assert second == first
+
+
+def test_parse_symphony_file_ignores_corrupt_cache(tmp_path, monkeypatch):
+    """Test that an unreadable cache entry is re-parsed instead of raising."""
+    from composer_parser import lisp_parser
+
+    monkeypatch.setattr(lisp_parser, 'CACHE_DIR', str(tmp_path / 'cache'))
+    symphony_file = tmp_path / 'symphony.json'
+    symphony_file.write_text('(defsymphony "Test" {} (weight-equal [(asset "SPY" "SPY")]))')
+    expected = lisp_parser.parse_symphony_file(str(symphony_file), use_cache=False)
+
+    lisp_parser.parse_symphony_file(str(symphony_file))
+    (cache_file,) = (tmp_path / 'cache').glob('*.pkl')
+    # A pickle that references a class which no longer exists
+    cache_file.write_bytes(b"cbuiltins\nNoSuchClass\n.")
+
+    assert lisp_parser.parse_symphony_file(str(symphony_file)) == expected
+
+
+def test_parse_symphony_file_cache_keyed_on_parser_source(tmp_path, monkeypatch):
+    """Test that a parser change invalidates earlier cache entries."""
+    from composer_parser import lisp_parser
+
+    monkeypatch.setattr(lisp_parser, 'CACHE_DIR', str(tmp_path / 'cache'))
+    symphony_file = tmp_path / 'symphony.json'
+    symphony_file.write_text('(defsymphony "Test" {} (weight-equal [(asset "SPY" "SPY")]))')
+
+    lisp_parser.parse_symphony_file(str(symphony_file))
+    monkeypatch.setattr(lisp_parser, '_PARSER_FINGERPRINT', 'changed parser')
+    lisp_parser.parse_symphony_file(str(symphony_file))
+
+    assert len(list((tmp_path / 'cache').glob('*.pkl'))) == 2
+
+
+def _percent_weights(column):
+    """
+    Parses a ground truth weight column such as "12.5%" into numbers.
+
+    Blank cells are unselected and become NaN. Any other value is a format the
+    comparison does not understand, so it raises instead of being ignored.
+    """
+    values = column[column.notna()].astype(str).str.strip()
+    values = values[values != '']
+    numbers = values.str.extract(r'^(-?\d+(?:\.\d+)?)%$', expand=False)
+    malformed = values[numbers.isna()]
+    if not malformed.empty:
+        raise ValueError(f"Unexpected weight in column {column.name}: {malformed.unique()[:5].tolist()}")
+    return pd.to_numeric(numbers).reindex(column.index)
+
+
+def test_percent_weights_parses_strictly():
+    """Test that ground truth weights parse percentages and blanks, and reject anything else."""
+    column = pd.Series(['50%', np.nan, ' 12.5% ', '0%', ''], name='SPY', dtype=object)
+    expected = pd.Series([50.0, np.nan, 12.5, 0.0, np.nan], name='SPY')
+    pd.testing.assert_series_equal(_percent_weights(column), expected)
+    assert _percent_weights(pd.Series([np.nan, np.nan], name='SPY')).isna().all()
+
+    for bad in ['50', '12,5%', 'n/a', 0.5]:
+        with pytest.raises(ValueError, match='SPY'):
+            _percent_weights(pd.Series(['50%', bad], name='SPY', dtype=object))
+
+
+@pytest.mark.slow
+@pytest.mark.integration
 def test_full_ticker_selection_matches_ground_truth():
     """
     Integration test: Compare SymphonyScanner+ComposerStrategy ticker selections to composer-tickers.csv ground truth.
@@ -218,34 +468,36 @@ def test_full_ticker_selection_matches_ground_truth():
 
     # Load ground truth
     import pandas as pd
-    gt = pd.read_csv('composer-tickers.csv')
+    # pyarrow's multithreaded CSV reader is used when the optional dependency is installed
+    engine = 'pyarrow' if importlib.util.find_spec('pyarrow') else None
+    gt = pd.read_csv('composer-tickers.csv', engine=engine)
     gt['Date'] = pd.to_datetime(gt['Date'])
     gt = gt.set_index('Date')
     gt_tickers = [col for col in gt.columns if col not in ('Date', 'Day Traded', '$USD')]
 
     # Build ground truth selection dict: {date: set of tickers}
-    gt_selection = {}
-    for date, row in gt.iterrows():
-        tickers = set()
-        for t in gt_tickers:
-            val = row[t]
-            if isinstance(val, str) and '%' in val and float(val.replace('%','')) > 0:
-                tickers.add(t)
-        if tickers:
-            gt_selection[pd.to_datetime(date).strftime('%Y-%m-%d')] = tickers
+    selected = gt[gt_tickers].apply(_percent_weights) > 0
+    gt_selection = {
+        date: set(selected.columns[row])
+        for date, row in zip(selected.index.strftime('%Y-%m-%d'), selected.to_numpy())
+        if row.any()
+    }
 
     # Only compare dates present in both parser output and ground truth
     common_dates = set(parser_selections.keys()) & set(gt_selection.keys())
     mismatches = []
-    for date in sorted(common_dates):
-        parser_tickers = parser_selections.get(date, set())
-        gt_tickers_set = gt_selection.get(date, set())
-        if parser_tickers != gt_tickers_set:
+    for date in common_dates:
+        parser_tickers = parser_selections[date]
+        gt_tickers_set = gt_selection[date]
+        if parser_tickers ^ gt_tickers_set:
             mismatches.append((date, parser_tickers, gt_tickers_set))
+    # Only the mismatches need a stable order for the log
+    mismatches.sort(key=lambda mismatch: mismatch[0])
 
     if mismatches:
         for date, parser, truth in mismatches[:10]:
-            logging.error(f"Mismatch on {date}: parser={parser}, truth={truth}")
+            logging.error(f"Mismatch on {date}: parser={parser}, truth={truth} "
+                          f"(extra={parser - truth}, missing={truth - parser})")
     assert not mismatches, f"Ticker selection mismatches found: {len(mismatches)} (see log for details)"
 
 
@@ -0,0 +1,243 @@
+"""
+Tests for the SymphonyScanner data handling.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from composer_parser.lisp_parser import parse_symphony_file
+from composer_parser.symphony_scanner import SymphonyScanner
+
+
+class TestSymphonyScanner:
+    """Test cases for SymphonyScanner data handling."""
+
+    @staticmethod
+    def fake_download(tickers):
+        """Builds a yfinance-style frame with (ticker, field) columns."""
+        index = pd.date_range('2024-01-01', periods=3, freq='D')
+        frames = {
+            ticker: pd.DataFrame({'Close': [1.0, 2.0, 3.0], 'Volume': [10, 20, 30]}, index=index)
+            for ticker in tickers
+        }
+        return pd.concat(frames, axis=1)
+
+    def test_scan_tree_collects_tickers_and_indicators(self):
+        """Test that one walk finds tickers, group members and indicator windows."""
+        symphony = [
+            "weight-equal",
+            [
+                "if",
+                [">", ["rsi", "TQQQ", [":window", 10]], 79],
+                [["group", "UVXY+BIL", [["asset", "UVXY", "UVXY"], ["asset", "BIL", "BIL"]]]],
+                [["if", ["<", ["current-price", "SPY"], ["moving-average-price", "SPY", {":window": 200}]],
+                  [["asset", "SPY", "SPY"]], [["asset", "TLT", "TLT"]]]]
+            ]
+        ]
+
+        tickers, indicators = SymphonyScanner('symphony.json')._scan_tree(symphony)
+
+        assert tickers == {'TQQQ', 'UVXY', 'BIL', 'SPY', 'TLT'}
+        assert list(indicators) == [('rsi', 10), ('ma', 200)]
+
+    def test_symphony_parsed_once_per_file_version(self):
+        """Test that scanning and building the evaluator share one parse."""
+        scanner = SymphonyScanner('symphony.json')
+
+        with patch('composer_parser.symphony_scanner.parse_symphony_file',
+                   wraps=parse_symphony_file) as parse:
+            scanner.scan_symphony()
+            scanner.create_strategy_evaluator()
+
+        assert parse.call_count == 1
+
+    def test_download_market_data_splits_tickers(self, tmp_path):
+        """Test that each downloaded ticker gets its own flat DataFrame."""
+        scanner = SymphonyScanner('symphony.json')
+        scanner.cache_dir = str(tmp_path)
+        scanner.all_tickers = {'SPY', 'TQQQ', 'MISSING'}
+
+        with patch('composer_parser.symphony_scanner.yf.download',
+                   return_value=self.fake_download(['SPY', 'TQQQ'])):
+            market_data = scanner.download_market_data('2024-01-01', '2024-01-04')
+
+        assert set(market_data) == {'SPY', 'TQQQ', 'MISSING'}
+        assert list(market_data['SPY'].columns) == ['Close', 'Volume']
+        assert market_data['TQQQ']['Close'].tolist() == [1.0, 2.0, 3.0]
+        assert market_data['SPY']['Close'].dtype == np.float32
+        assert market_data['SPY']['Volume'].dtype == np.int64
+        assert market_data['SPY'].index is market_data['TQQQ'].index
+        assert market_data['MISSING'].empty
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_download_market_data_in_chunks(self, tmp_path, workers):
+        """Test that chunked downloads are merged like a single request, serially or concurrently."""
+        scanner = SymphonyScanner('symphony.json')
+        scanner.cache_dir = str(tmp_path)
+        scanner.download_chunk_size = 2
+        scanner.download_workers = workers
+        scanner.all_tickers = {'SPY', 'TQQQ', 'TLT'}
+
+        with patch('composer_parser.symphony_scanner.yf.download',
+                   side_effect=lambda chunk, **kwargs: self.fake_download(chunk)) as download:
+            market_data = scanner.download_market_data('2024-01-01', '2024-01-04', use_cache=False)
+
+        assert sorted(len(call.args[0]) for call in download.call_args_list) == [1, 2]
+        assert set(market_data) == {'SPY', 'TQQQ', 'TLT'}
+        assert all(df['Close'].tolist() == [1.0, 2.0, 3.0] for df in market_data.values())
+
+    @pytest.mark.parametrize("chunk_size", [1, 50])
+    def test_download_market_data_skips_failed_chunk(self, tmp_path, chunk_size):
+        """Test that a failing chunk leaves only its own tickers without data."""
+        scanner = SymphonyScanner('symphony.json')
+        scanner.cache_dir = str(tmp_path)
+        scanner.download_chunk_size = chunk_size
+        scanner.all_tickers = {'SPY', 'TQQQ'}
+
+        def download(chunk, **kwargs):
+            if 'TQQQ' in chunk:
+                raise ConnectionError("rate limited")
+            return self.fake_download(chunk)
+
+        with patch('composer_parser.symphony_scanner.yf.download', side_effect=download):
+            market_data = scanner.download_market_data('2024-01-01', '2024-01-04', use_cache=False)
+
+        if chunk_size == 1:
+            assert market_data['SPY']['Close'].tolist() == [1.0, 2.0, 3.0]
+        else:
+            assert market_data['SPY'].empty
+        assert market_data['TQQQ'].empty
+
+    @pytest.mark.parametrize("chunk_size", [1, 50])
+    def test_download_market_data_propagates_programming_errors(self, tmp_path, chunk_size):
+        """Test that errors other than network or yfinance failures are not swallowed."""
+        scanner = SymphonyScanner('symphony.json')
+        scanner.cache_dir = str(tmp_path)
+        scanner.download_chunk_size = chunk_size
+        scanner.all_tickers = {'SPY', 'TQQQ'}
+
+        with patch('composer_parser.symphony_scanner.yf.download', side_effect=TypeError("bad argument")):
+            with pytest.raises(TypeError):
+                scanner.download_market_data('2024-01-01', '2024-01-04', use_cache=False)
+
+    def test_download_market_data_uses_parquet_cache(self, tmp_path):
+        """Test that cached tickers are read from Parquet and only the rest are downloaded."""
+        pytest.importorskip('pyarrow')
+        scanner = SymphonyScanner('symphony.json')
+        scanner.cache_dir = str(tmp_path)
+        scanner.all_tickers = {'SPY'}
+        with patch('composer_parser.symphony_scanner.yf.download',
+                   return_value=self.fake_download(['SPY'])):
+            first = scanner.download_market_data('2024-01-01', '2024-01-04')
+        assert scanner.has_cache('SPY', '2024-01-01', '2024-01-04')
+        assert not scanner.has_cache('SPY', '2024-01-01', '2024-02-01')
+
+        scanner.all_tickers = {'SPY', 'TQQQ'}
+        with patch('composer_parser.symphony_scanner.yf.download',
+                   return_value=self.fake_download(['TQQQ'])) as download:
+            second = scanner.download_market_data('2024-01-01', '2024-01-04')
+
+        assert download.call_args.args[0] == ['TQQQ']
+        pd.testing.assert_frame_equal(second['SPY'], first['SPY'], check_freq=False)
+        assert second['TQQQ']['Close'].tolist() == [1.0, 2.0, 3.0]
+
+    def test_download_market_data_aligns_cached_and_fresh_dates(self, tmp_path):
+        """Test that mixing cached and downloaded tickers gives the same index as one download."""
+        pytest.importorskip('pyarrow')
+
+        def download(tickers, *args, **kwargs):
+            spy = pd.DataFrame({'Close': [1.0, 2.0, 3.0], 'Volume': [10, 20, 30]},
+                               index=pd.date_range('2024-01-01', periods=3, freq='D'))
+            new = pd.DataFrame({'Close': [4.0, 5.0, 6.0], 'Volume': [40, 50, 60]},
+                               index=pd.date_range('2024-01-02', periods=3, freq='D'))
+            parts = {'SPY': spy, 'NEW': new}
+            return pd.concat({ticker: parts[ticker] for ticker in tickers}, axis=1)
+
+        cold = SymphonyScanner('symphony.json')
+        cold.cache_dir = str(tmp_path / 'cold')
+        cold.all_tickers = {'SPY', 'NEW'}
+        with patch('composer_parser.symphony_scanner.yf.download', side_effect=download):
+            expected = cold.download_market_data('2024-01-01', '2024-01-05', use_cache=False)
+
+        warm = SymphonyScanner('symphony.json')
+        warm.cache_dir = str(tmp_path / 'warm')
+        warm.all_tickers = {'SPY'}
+        with patch('composer_parser.symphony_scanner.yf.download', side_effect=download):
+            warm.download_market_data('2024-01-01', '2024-01-05')
+        warm.all_tickers = {'SPY', 'NEW'}
+        with patch('composer_parser.symphony_scanner.yf.download', side_effect=download) as mock:
+            mixed = warm.download_market_data('2024-01-01', '2024-01-05')
+
+        assert mock.call_args.args[0] == ['NEW']
+        for ticker in ('SPY', 'NEW'):
+            pd.testing.assert_frame_equal(mixed[ticker], expected[ticker], check_freq=False)
+        assert len(mixed['SPY']) == 4
+        assert mixed['SPY'].index is mixed['NEW'].index
+        assert warm.common_dates.equals(cold.common_dates)
+        assert warm.global_earliest == cold.global_earliest
+
+    def test_indicator_windows_follow_all_indicators(self):
+        """Test that window arrays are derived from all_indicators and reset on assignment."""
+        scanner = SymphonyScanner('symphony.json')
+        scanner.all_indicators = {
+            ('rsi', 14): {'type': 'rsi', 'window': 14},
+            ('rsi', 10): {'type': 'rsi', 'window': 10},
+            ('ma', 200): {'type': 'ma', 'window': 200},
+        }
+        assert scanner.rsi_windows.tolist() == [10, 14]
+        assert scanner.ma_windows.tolist() == [200]
+        assert scanner.max_indicator_window == 200
+
+        scanner.all_indicators = {}
+        assert scanner.rsi_windows.tolist() == [] and scanner.ma_windows.tolist() == []
+        assert scanner.max_indicator_window == 0
+
+    def test_scan_symphony_walks_tree_once_per_parse(self):
+        """Test that rescanning an unchanged symphony reuses the previous walk."""
+        scanner = SymphonyScanner('symphony.json')
+        with patch.object(scanner, '_scan_tree', wraps=scanner._scan_tree) as scan_tree:
+            first = scanner.scan_symphony()
+            first[0].add('MUTATED')
+            second = scanner.scan_symphony()
+
+        assert scan_tree.call_count == 1
+        assert 'MUTATED' not in second[0]
+        assert second[1] == first[1]
+
+    def test_date_spans_cached_until_market_data_changes(self):
+        """Test that common dates and global bounds are cached per market_data assignment."""
+        scanner = SymphonyScanner('symphony.json')
+        scanner.market_data = {
+            'SPY': pd.DataFrame({'Close': 1.0}, index=pd.date_range('2024-01-01', periods=5)),
+            'TQQQ': pd.DataFrame({'Close': 1.0}, index=pd.date_range('2024-01-03', periods=5)),
+        }
+
+        assert list(scanner.common_dates.strftime('%Y-%m-%d')) == ['2024-01-03', '2024-01-04', '2024-01-05']
+        assert scanner.global_earliest == pd.Timestamp('2024-01-03')
+        assert scanner.global_latest == pd.Timestamp('2024-01-05')
+
+        scanner.market_data = {'SPY': scanner.market_data['SPY']}
+        assert len(scanner.common_dates) == 5
+        assert scanner.global_earliest == pd.Timestamp('2024-01-01')
+
+        scanner.market_data = {'SPY': scanner.market_data['SPY'].iloc[::-1], 'EMPTY': pd.DataFrame()}
+        assert scanner.global_earliest == pd.Timestamp('2024-01-01')
+        assert scanner.global_latest == pd.Timestamp('2024-01-05')
+
+    def test_calculate_all_indicators_casts_only_price_columns(self):
+        """Test that indicators are appended as float32 while Volume keeps its dtype."""
+        scanner = SymphonyScanner('symphony.json')
+        scanner.all_indicators = {('rsi', 2): {'type': 'rsi', 'window': 2}}
+        downloaded = self.fake_download(['SPY', 'TQQQ'])
+        scanner.market_data = {ticker: downloaded[ticker] for ticker in ['SPY', 'TQQQ']}
+        scanner.market_data['MISSING'] = pd.DataFrame()
+
+        scanner.calculate_all_indicators()
+
+        spy = scanner.market_data['SPY']
+        assert list(spy.columns) == ['Close', 'Volume', 'RSI_2', 'current_price']
+        assert spy['current_price'].tolist() == [1.0, 2.0, 3.0]
+        assert spy['Close'].dtype == spy['RSI_2'].dtype == np.float32
+        assert spy['Volume'].dtype == np.int64
+        assert scanner.market_data['MISSING'].empty